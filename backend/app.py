@@ -1,14 +1,65 @@
-from flask import Flask, jsonify, request
+import base64
+import binascii
+import csv
+import io
+import hashlib
+import hmac
+import json
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from functools import partial, wraps
+from urllib.parse import urlencode
+
+import queue
+import sys
+
+import click
+from flask import (
+    Blueprint,
+    Flask,
+    Response,
+    abort,
+    current_app,
+    g,
+    jsonify,
+    make_response,
+    request,
+    stream_with_context,
+)
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import or_
+from sqlalchemy import (
+    and_,
+    delete,
+    event,
+    exists,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    tuple_,
+    union,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import configure_mappers, joinedload, make_transient_to_detached
+from werkzeug.utils import import_string
 from flask_jwt_extended import (
     JWTManager,
     create_access_token,
+    create_refresh_token,
+    decode_token,
+    get_current_user,
+    get_jwt,
     get_jwt_identity,
     jwt_required,
 )
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt.exceptions import PyJWTError
 
 # config data from config.py
 from config import Config
@@ -16,25 +67,48 @@ from config import Config
 # migrate
 from flask_migrate import Migrate
 
-# create the app
-app = Flask(__name__)
-CORS(app)
+from cache import LRUCache
+from db_pool import dispose_after_fork, engine_options, pool_stats, pre_connect
+from json_provider import FastJSONProvider
+from password_hashing import HashingPoolBusy, PasswordHasher
+from pubsub import TooManySubscribers
+from replica import RoutingSession, replica_binds
+from sql_instrumentation import SQLInstrumentation
+from token_blocklist import TokenBlocklist
 
-# from config file
-app.config.from_object(Config)
-
-app.config["SQLALCHEMY_DATABASE_URI"]
-app.config["JWT_SECRET_KEY"]
-app.config["JWT_ACCESS_TOKEN_EXPIRES"] = 60 * 60 * 24
-# disables a feature that automatically tracks modifications to objects and emits signals
-app.config["SQLALCHEMY_TRACK_MODIFICATIONS"]
+# extensions and per process state, bound to an app by create_app()
 
 # this variable, db, will be used for all SQLAlchemy commands
-db = SQLAlchemy(app)
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+
+migrate = Migrate()
+
+jwt = JWTManager()
+
+# routes, error handlers and CLI commands of the app
+bp = Blueprint("api", __name__, cli_group=None)
+
+sql_instrumentation = SQLInstrumentation()
+
+password_hasher = PasswordHasher()
 
-migrate = Migrate(app, db)
+# users resolved from JWT identities, keyed by email
+user_cache = LRUCache()
+
+# rendered organization responses, keyed by (endpoint, org, version, query)
+org_response_cache = LRUCache()
+
+# revoked token ids, checked by every @jwt_required route
+token_blocklist = TokenBlocklist()
+
+# roles checked by @require_org_role, keyed by (user id, org id)
+membership_cache = LRUCache()
+
+
+# naive UTC, the DateTime columns are stored without a time zone
+def utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
 
-jwt = JWTManager(app)
 
 owners = db.Table(
     "owners",
@@ -45,6 +119,8 @@ owners = db.Table(
         db.ForeignKey("organization.id"),
         primary_key=True,
     ),
+    # the primary key starts with user_id, lookups by organization need their own
+    db.Index("ix_owners_organization_id_user_id", "organization_id", "user_id"),
 )
 
 admins = db.Table(
@@ -56,6 +132,8 @@ admins = db.Table(
         db.ForeignKey("organization.id"),
         primary_key=True,
     ),
+    # the primary key starts with user_id, lookups by organization need their own
+    db.Index("ix_admins_organization_id_user_id", "organization_id", "user_id"),
 )
 
 employees = db.Table(
@@ -67,6 +145,8 @@ employees = db.Table(
         db.ForeignKey("organization.id"),
         primary_key=True,
     ),
+    # the primary key starts with user_id, lookups by organization need their own
+    db.Index("ix_employees_organization_id_user_id", "organization_id", "user_id"),
 )
 
 pending_invitations = db.Table(
@@ -85,6 +165,41 @@ pending_invitations = db.Table(
     ),
     db.Column("status", db.Boolean, default=False),
     db.Column("user_response", db.Boolean, default=None, nullable=True),
+    db.Column("created_at", db.DateTime, default=utcnow),
+    # set by accepting or declining, resolved invitations are moved to
+    # archived_invitations by `flask archive-invitations`
+    db.Column("responded_at", db.DateTime, nullable=True),
+    db.Index(
+        "ix_pending_invitations_organization_id_user_id", "organization_id", "user_id"
+    ),
+    db.Index("ix_pending_invitations_responded_at", "responded_at"),
+)
+
+archived_invitations = db.Table(
+    "archived_invitations",
+    db.Column("id", db.Integer, primary_key=True),
+    db.Column("user_id", db.Integer, nullable=False),
+    db.Column("organization_id", db.Integer, nullable=False, index=True),
+    db.Column("status", db.Boolean),
+    db.Column("user_response", db.Boolean),
+    db.Column("created_at", db.DateTime),
+    db.Column("responded_at", db.DateTime),
+    db.Column("archived_at", db.DateTime, nullable=False),
+)
+
+# completed tasks per organization, user and day. Maintained by the task routes
+# in the same transaction as the task changes, like Organization.task_count
+task_completion_stats = db.Table(
+    "task_completion_stats",
+    db.Column(
+        "organization_id",
+        db.Integer,
+        db.ForeignKey("organization.id"),
+        primary_key=True,
+    ),
+    db.Column("user_id", db.Integer, db.ForeignKey("user.id"), primary_key=True),
+    db.Column("day", db.Date, primary_key=True),
+    db.Column("completed", db.Integer, nullable=False, default=0),
 )
 
 
@@ -92,6 +207,19 @@ pending_invitations = db.Table(
 class Organization(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(80), unique=True, nullable=False)
+    # bumped by every change to the organization, its members, invitations or
+    # tasks, cached organization responses are keyed on it
+    version = db.Column(db.Integer, nullable=False, default=1, server_default="1")
+    # task totals, updated with the version by the task routes
+    task_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    completed_task_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )
+    # bumped with the version when owners, admins or employees change, cached
+    # roles are only valid for the membership version they were read at
+    membership_version = db.Column(
+        db.Integer, nullable=False, default=1, server_default="1"
+    )
 
     # Relationships with users
     owners = db.relationship("User", secondary=owners)
@@ -105,23 +233,7 @@ class Organization(db.Model):
 
     # serializer
     def serialize(self):
-        owners_details = [
-            {"id": owner.id, "email": owner.email} for owner in self.owners
-        ]
-        admins_details = [
-            {"id": admin.id, "email": admin.email} for admin in self.admins
-        ]
-        employees_details = [
-            {"id": employee.id, "email": employee.email} for employee in self.employees
-        ]
-
-        return {
-            "id": self.id,
-            "name": self.name,
-            "owners": owners_details,
-            "admins": admins_details,
-            "employees": employees_details,
-        }
+        return serialize_organizations([self])[0]
 
 
 class User(db.Model):
@@ -145,12 +257,16 @@ class User(db.Model):
 
     # serializer
     def serialize(self):
-        return {
-            "id": self.id,
-            "email": self.email,
-            "organizations_owning": [org.id for org in self.organizations_owning],
-            "organizations_working": [org.id for org in self.organizations_working],
-        }
+        return serialize_users([self.id])[0]
+
+
+# case insensitive email prefix search (/users/search). text_pattern_ops lets
+# Postgres answer LIKE 'prefix%' from the index whatever the database collation
+db.Index(
+    "ix_user_email_lower",
+    func.lower(User.email).label("email_lower"),
+    postgresql_ops={"email_lower": "text_pattern_ops"},
+)
 
 
 class Task(db.Model):
@@ -168,18 +284,876 @@ class Task(db.Model):
 
     organization = db.relationship("Organization", back_populates="tasks")
 
+    # task listings page through an organization's tasks in id order, or
+    # filter on completion and sort by completion date within it
+    __table_args__ = (
+        db.Index("ix_task_organization_id_id", "organization_id", "id"),
+        db.Index(
+            "ix_task_organization_id_completed_completed_at",
+            "organization_id",
+            "completed",
+            "completed_at",
+        ),
+    )
+
+    # serializer
+    def serialize(self):
+        return {
+            "id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "completed": self.completed,
+            "completed_by": self.completed_by,
+            "completed_by_email": self.completed_by_email,
+            "completed_at": self.completed_at,
+        }
+
+
+# tokens revoked by /logout, kept until they would have expired anyway
+class RevokedToken(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(36), nullable=False, unique=True)
+    token_type = db.Column(db.String(10), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    revoked_at = db.Column(db.DateTime, nullable=False, default=utcnow, index=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+
+# drop cached users whenever their row changes
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def invalidate_cached_user(mapper, connection, target):
+    user_cache.delete(target.email)
+    for old_email in db.inspect(target).attrs.email.history.deleted:
+        user_cache.delete(old_email)
+
+
+def load_revoked_tokens(since):
+    query = select(RevokedToken.jti, RevokedToken.revoked_at).where(
+        RevokedToken.expires_at > utcnow()
+    )
+    if since is not None:
+        query = query.where(RevokedToken.revoked_at >= since)
+    return db.session.execute(query.order_by(RevokedToken.revoked_at)).all()
+
+
+# runs for every @jwt_required route. Tokens the Bloom filter has never seen
+# are not revoked, only possible matches are confirmed with a query
+@jwt.token_in_blocklist_loader
+def check_if_token_revoked(jwt_header, jwt_data):
+    token_blocklist.sync(load_revoked_tokens)
+
+    jti = jwt_data["jti"]
+    if not token_blocklist.might_be_revoked(jti):
+        return False
+    return db.session.execute(select(exists().where(RevokedToken.jti == jti))).scalar()
+
+
+def revoke_token(jwt_data, user_id):
+    jti = jwt_data["jti"]
+    if db.session.execute(select(exists().where(RevokedToken.jti == jti))).scalar():
+        return
 
-@app.route("/signup", methods=["POST"])
+    if "exp" in jwt_data:
+        expires_at = datetime.fromtimestamp(jwt_data["exp"], timezone.utc)
+        expires_at = expires_at.replace(tzinfo=None)
+    else:
+        expires_at = datetime.max
+    db.session.add(
+        RevokedToken(
+            jti=jti,
+            token_type=jwt_data["type"],
+            user_id=user_id,
+            expires_at=expires_at,
+        )
+    )
+
+
+# resolves the user of every @jwt_required route, cached users are merged into
+# the session without a query
+@jwt.user_lookup_loader
+def load_current_user(jwt_header, jwt_data):
+    email = jwt_data[current_app.config["JWT_IDENTITY_CLAIM"]]
+
+    cached = user_cache.get(email)
+    if cached is not None:
+        user = User(**cached)
+        make_transient_to_detached(user)
+        return db.session.merge(user, load=False)
+
+    user = User.query.filter_by(email=email).first()
+    if user is not None:
+        user_cache.set(
+            email, {"id": user.id, "email": user.email, "password": user.password}
+        )
+    return user
+
+
+@jwt.user_lookup_error_loader
+def user_lookup_error(jwt_header, jwt_data):
+    return jsonify({"message": "User not found"}), 404
+
+
+# membership queries against the association tables, each check is a primary
+# key lookup instead of loading the organization's member collections
+ROLE_TABLES = {
+    "owner": owners,
+    "admin": admins,
+    "employee": employees,
+}
+
+
+# key of a role's member list in serialized organizations
+def role_members_key(role):
+    return role + "s"
+
+
+def has_org_role(user_id, org_id, *roles):
+    return db.session.query(
+        or_(
+            *[
+                exists().where(
+                    ROLE_TABLES[role].c.user_id == user_id,
+                    ROLE_TABLES[role].c.organization_id == org_id,
+                )
+                for role in roles
+            ]
+        )
+    ).scalar()
+
+
+# the user's highest role in the organization, None for non members
+def get_org_role(user_id, org_id):
+    roles = set(db.session.execute(org_roles_statement(user_id, org_id)).scalars())
+    return next((role for role in ROLE_TABLES if role in roles), None)
+
+
+def org_roles_statement(user_id, org_id):
+    return union_all(
+        *[
+            select(literal(role)).where(
+                table.c.user_id == user_id, table.c.organization_id == org_id
+            )
+            for role, table in ROLE_TABLES.items()
+        ]
+    )
+
+
+def add_org_member(user_id, org_id, role):
+    db.session.execute(
+        ROLE_TABLES[role].insert().values(user_id=user_id, organization_id=org_id)
+    )
+
+
+# returns whether the user had any of the roles
+def remove_org_member(user_id, org_id, *roles):
+    removed = 0
+    for role in roles:
+        table = ROLE_TABLES[role]
+        removed += db.session.execute(
+            table.delete().where(
+                table.c.user_id == user_id, table.c.organization_id == org_id
+            )
+        ).rowcount
+    return removed > 0
+
+
+# ids of the given users that are owners, admins or employees of the organization
+def organization_member_ids(org_id, user_ids):
+    if not user_ids:
+        return set()
+
+    members = union_all(
+        *[
+            select(table.c.user_id).where(
+                table.c.organization_id == org_id, table.c.user_id.in_(user_ids)
+            )
+            for table in ROLE_TABLES.values()
+        ]
+    )
+    return set(db.session.execute(members).scalars())
+
+
+# serializes many organizations at once, loading the members of all of them
+# in a single query instead of three lazy loads per organization
+def serialize_organizations(organizations):
+    if not organizations:
+        return []
+
+    org_ids = [org.id for org in organizations]
+    members = db.session.execute(organization_members_statement(org_ids)).all()
+
+    details = {
+        org_id: {role_members_key(role): [] for role in ROLE_TABLES}
+        for org_id in org_ids
+    }
+    for role, org_id, user_id, email in members:
+        details[org_id][role_members_key(role)].append({"id": user_id, "email": email})
+
+    return [
+        {"id": org.id, "name": org.name, **details[org.id]} for org in organizations
+    ]
+
+
+# users with the ids of the organizations they own and work in (as admin or
+# employee), read with one query however many users are serialized. Users are
+# returned in the order of user_ids, missing ids are skipped
+def serialize_users(user_ids):
+    if not user_ids:
+        return []
+
+    rows = db.session.execute(user_organizations_statement(user_ids)).all()
+
+    users = {}
+    for user_id, email, kind, org_id in rows:
+        user = users.setdefault(
+            user_id,
+            {
+                "id": user_id,
+                "email": email,
+                "organizations_owning": [],
+                "organizations_working": [],
+            },
+        )
+        if kind is not None:
+            user["organizations_%s" % kind].append(org_id)
+
+    return [users[user_id] for user_id in user_ids if user_id in users]
+
+
+def user_organizations_statement(user_ids):
+    memberships = union(
+        *[
+            select(
+                literal(kind).label("kind"),
+                table.c.user_id,
+                table.c.organization_id,
+            ).where(table.c.user_id.in_(user_ids))
+            for kind, table in (
+                ("owning", owners),
+                ("working", admins),
+                ("working", employees),
+            )
+        ]
+    ).subquery()
+
+    return (
+        select(User.id, User.email, memberships.c.kind, memberships.c.organization_id)
+        .outerjoin(memberships, memberships.c.user_id == User.id)
+        .where(User.id.in_(user_ids))
+        .order_by(User.id, memberships.c.organization_id)
+    )
+
+
+def organization_members_statement(org_ids):
+    memberships = union_all(
+        *[
+            select(
+                literal(role).label("role"),
+                table.c.organization_id,
+                table.c.user_id,
+            ).where(table.c.organization_id.in_(org_ids))
+            for role, table in ROLE_TABLES.items()
+        ]
+    ).subquery()
+
+    return (
+        select(memberships.c.role, memberships.c.organization_id, User.id, User.email)
+        .join(User, User.id == memberships.c.user_id)
+        .order_by(User.id)
+    )
+
+
+# users whose lowercased email starts with prefix, leaving out the members of
+# the organization and the users it already invited. Postgres matches with
+# LIKE on the text_pattern_ops index, other databases with a range scan of
+# lower(email) between the prefix and the next string after all its matches
+def user_search_statement(prefix, org_id, limit):
+    email = func.lower(User.email)
+    if db.session.get_bind().dialect.name == "postgresql":
+        escaped = re.sub(r"([\\%_])", r"\\\1", prefix)
+        matches = email.like(escaped + "%")
+    else:
+        matches = (email >= prefix) & (email < prefix[:-1] + chr(ord(prefix[-1]) + 1))
+
+    excluded = union_all(
+        *[
+            select(table.c.user_id).where(table.c.organization_id == org_id)
+            for table in (*ROLE_TABLES.values(), pending_invitations)
+        ]
+    )
+    return (
+        select(User.id, User.email)
+        .where(matches, User.id.not_in(excluded))
+        .order_by(email, User.id)
+        .limit(limit)
+    )
+
+
+def owned_organizations_query(user_id):
+    return Organization.query.join(
+        owners, owners.c.organization_id == Organization.id
+    ).filter(owners.c.user_id == user_id)
+
+
+# organizations where the user is an admin or employee
+def working_organizations_query(user_id):
+    return Organization.query.filter(
+        Organization.id.in_(
+            union(
+                select(admins.c.organization_id).where(admins.c.user_id == user_id),
+                select(employees.c.organization_id).where(
+                    employees.c.user_id == user_id
+                ),
+            )
+        )
+    )
+
+
+def user_invitations_query(user_id):
+    return (
+        db.session.query(pending_invitations)
+        .filter(pending_invitations.c.user_id == user_id)
+        .join(Organization, pending_invitations.c.organization_id == Organization.id)
+        .with_entities(
+            Organization.id,
+            Organization.name,
+            pending_invitations.c.status,
+            pending_invitations.c.user_response,
+        )
+    )
+
+
+def organization_tasks_query(org_id):
+    return Task.query.filter_by(organization_id=org_id)
+
+
+TASK_SORTS = {
+    "id": (Task.id,),
+    "completed_at": (Task.completed_at, Task.id),
+    "title": (Task.title, Task.id),
+}
+
+
+# a date alone means the whole day, so completed_to=2026-10-18 includes it
+def parse_date_param(name, end=False):
+    value = request.args.get(name)
+    if value is None:
+        return None
+    try:
+        if len(value) == 10:
+            day = datetime.fromisoformat(value)
+            return day + timedelta(days=1) if end else day
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise InvalidTaskFilter("%s must be an ISO 8601 date or datetime" % name)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+# the ?completed=, completed_by=, completed_from=, completed_to=, q= and sort=
+# parameters of the task listing, applied to the query in SQL
+def filter_organization_tasks(query):
+    completed = request.args.get("completed")
+    if completed is not None:
+        if completed not in ("true", "false"):
+            raise InvalidTaskFilter("completed must be true or false")
+        query = query.filter(Task.completed == (completed == "true"))
+
+    completed_by = request.args.get("completed_by")
+    if completed_by is not None:
+        try:
+            query = query.filter(Task.completed_by == int(completed_by))
+        except ValueError:
+            raise InvalidTaskFilter("completed_by must be a user id")
+
+    completed_from = parse_date_param("completed_from")
+    if completed_from is not None:
+        query = query.filter(Task.completed_at >= completed_from)
+    completed_to = parse_date_param("completed_to", end=True)
+    if completed_to is not None:
+        query = query.filter(Task.completed_at < completed_to)
+
+    title = request.args.get("q", "").strip()
+    if title:
+        escaped = re.sub(r"([\\%_])", r"\\\1", title)
+        query = query.filter(Task.title.ilike("%" + escaped + "%", escape="\\"))
+
+    sort = request.args.get("sort", "id")
+    columns = TASK_SORTS.get(sort.lstrip("-"))
+    if columns is None:
+        raise InvalidTaskFilter(
+            "sort must be one of %s, prefixed with - for descending order"
+            % ", ".join(TASK_SORTS)
+        )
+    order = KeysetOrder(*columns, descending=sort.startswith("-"))
+    return query, order
+
+
+def organization_invitations_query(org_id):
+    return (
+        db.session.query(pending_invitations)
+        .filter(pending_invitations.c.organization_id == org_id)
+        .join(User, pending_invitations.c.user_id == User.id)
+        .with_entities(
+            User.id,
+            User.email,
+            pending_invitations.c.status,
+            pending_invitations.c.user_response,
+        )
+    )
+
+
+def serialize_organization_invitation(invitation):
+    return {
+        "user_id": invitation.id,
+        "user_email": invitation.email,
+        "status": invitation.status,
+        "user_response": invitation.user_response,
+    }
+
+
+class InvalidPagination(Exception):
+    pass
+
+
+class InvalidTaskFilter(Exception):
+    pass
+
+
+# cursors are opaque to clients, they hold the sort key of the last row sent
+def encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeError, ValueError):
+        raise InvalidPagination("Invalid cursor")
+
+
+# sort order for keyset pagination: one or more columns in the same direction,
+# the last of them unique. NULLs sort after every value, last ascending and
+# first descending, like Postgres orders them by default. Cursors of a single
+# column order are the plain value, otherwise a list of the values
+class KeysetOrder:
+    def __init__(self, *columns, descending=False):
+        self.columns = columns
+        self.descending = descending
+
+    def _nullable(self, column):
+        return getattr(column.expression, "nullable", True)
+
+    def order_by(self):
+        clauses = []
+        for column in self.columns:
+            clause = column.desc() if self.descending else column.asc()
+            if self._nullable(column):
+                clause = (
+                    clause.nulls_first() if self.descending else clause.nulls_last()
+                )
+            clauses.append(clause)
+        return clauses
+
+    # rows sorted after the row the key values belong to
+    def after(self, values):
+        conditions = []
+        same = []
+        for column, value in zip(self.columns, values):
+            if value is None:
+                if self.descending:
+                    conditions.append(and_(*same, column.is_not(None)))
+                same.append(column.is_(None))
+                continue
+
+            if self.descending:
+                later = column < value
+            elif self._nullable(column):
+                later = or_(column > value, column.is_(None))
+            else:
+                later = column > value
+            conditions.append(and_(*same, later))
+            same.append(column == value)
+        return or_(*conditions)
+
+    # key values of an ORM row, in the form the cursor holds them
+    def key(self, row):
+        values = [getattr(row, column.key) for column in self.columns]
+        return values[0] if len(self.columns) == 1 else values
+
+    def encode(self, values):
+        if len(self.columns) == 1:
+            values = [values]
+        values = [
+            value.isoformat() if isinstance(value, datetime) else value
+            for value in values
+        ]
+        return encode_cursor(values[0] if len(self.columns) == 1 else values)
+
+    def decode(self, cursor):
+        values = decode_cursor(cursor)
+        if len(self.columns) == 1:
+            values = [values]
+        if not isinstance(values, list) or len(values) != len(self.columns):
+            raise InvalidPagination("Invalid cursor")
+        return [
+            self._decode_value(column, value)
+            for column, value in zip(self.columns, values)
+        ]
+
+    def _decode_value(self, column, value):
+        if value is None and self._nullable(column):
+            return None
+
+        python_type = column.type.python_type
+        try:
+            if python_type is datetime and isinstance(value, str):
+                return datetime.fromisoformat(value)
+        except ValueError:
+            raise InvalidPagination("Invalid cursor")
+        if not isinstance(value, python_type) or isinstance(value, bool):
+            raise InvalidPagination("Invalid cursor")
+        return value
+
+
+# keyset pagination over an indexed, unique key column or a KeysetOrder: the
+# next page starts after the key in the cursor, so every page costs the same.
+# Requests without limit/cursor keep getting a plain list, capped at
+# UNPAGINATED_MAX_ROWS with the cursor of the remaining rows in the
+# X-Next-Cursor header
+def paginated_response(query, key_column, row_key, serialize):
+    order = (
+        key_column if isinstance(key_column, KeysetOrder) else KeysetOrder(key_column)
+    )
+    cursor = request.args.get("cursor")
+    paginated = cursor is not None or "limit" in request.args
+
+    if paginated:
+        limit = request.args.get(
+            "limit", current_app.config["PAGINATION_DEFAULT_LIMIT"]
+        )
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise InvalidPagination("limit must be an integer")
+        if limit < 1 or limit > current_app.config["PAGINATION_MAX_LIMIT"]:
+            raise InvalidPagination(
+                "limit must be between 1 and %d"
+                % current_app.config["PAGINATION_MAX_LIMIT"]
+            )
+    else:
+        limit = current_app.config["UNPAGINATED_MAX_ROWS"]
+
+    if cursor is not None:
+        query = query.filter(order.after(order.decode(cursor)))
+
+    rows = query.order_by(*order.order_by()).limit(limit + 1).all()
+    next_cursor = order.encode(row_key(rows[limit - 1])) if len(rows) > limit else None
+    items = [serialize(row) for row in rows[:limit]]
+
+    if paginated:
+        return jsonify({"items": items, "next_cursor": next_cursor})
+
+    response = jsonify(items)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
+
+
+@bp.app_errorhandler(InvalidPagination)
+@bp.app_errorhandler(InvalidTaskFilter)
+def handle_invalid_pagination(error):
+    return jsonify({"message": str(error)}), 400
+
+
+# marks everything cached for the organization as stale, runs in the
+# transaction of the change
+def bump_organization_version(org_id, tasks=0, completed_tasks=0, members=False):
+    values = {"version": Organization.version + 1}
+    if members:
+        values["membership_version"] = Organization.membership_version + 1
+    if tasks:
+        values["task_count"] = Organization.task_count + tasks
+    if completed_tasks:
+        values["completed_task_count"] = (
+            Organization.completed_task_count + completed_tasks
+        )
+
+    db.session.execute(
+        update(Organization)
+        .where(Organization.id == org_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+
+
+# completion dates are sent as "18 Oct 2026" by the frontend (en-GB, where
+# September may be written "Sept"), ISO 8601 is accepted too
+def parse_completion_date(value):
+    if not isinstance(value, str):
+        return None
+
+    try:
+        return datetime.strptime(value.replace("Sept", "Sep"), "%d %b %Y")
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+# applies (user_id, completed_at, delta) changes to task_completion_stats with
+# one upsert, completions without a user or date are only counted in totals
+def record_task_completions(org_id, completions):
+    counts = {}
+    for user_id, completed_at, delta in completions:
+        if user_id is None or completed_at is None:
+            continue
+        key = (user_id, completed_at.date())
+        counts[key] = counts.get(key, 0) + delta
+
+    rows = [
+        {"organization_id": org_id, "user_id": user_id, "day": day, "completed": delta}
+        for (user_id, day), delta in counts.items()
+        if delta
+    ]
+    if not rows:
+        return
+
+    dialect = (
+        postgresql if db.session.get_bind().dialect.name == "postgresql" else sqlite
+    )
+    statement = dialect.insert(task_completion_stats)
+    db.session.execute(
+        statement.on_conflict_do_update(
+            index_elements=["organization_id", "user_id", "day"],
+            set_={
+                "completed": task_completion_stats.c.completed
+                + statement.excluded.completed
+            },
+        ),
+        rows,
+    )
+
+
+# events are published once the transaction that caused them commits, so
+# subscribers never see changes that were rolled back. Messages are complete
+# Server-Sent Events frames
+def queue_org_event(org_id, event_type, **data):
+    db.session.info.setdefault("org_events", []).append(
+        (int(org_id), {"type": event_type, "organization_id": int(org_id), **data})
+    )
+
+
+@event.listens_for(db.session, "after_commit")
+def publish_org_events(session):
+    for org_id, org_event in session.info.pop("org_events", []):
+        current_app.extensions["pubsub"].publish(
+            "organization:%d" % org_id,
+            "event: %s\ndata: %s\n\n"
+            % (org_event["type"], current_app.json.dumps(org_event)),
+        )
+
+
+@event.listens_for(db.session, "after_soft_rollback")
+def discard_org_events(session, previous_transaction):
+    session.info.pop("org_events", None)
+
+
+# conditional GETs for organization reads. The strong ETag is derived from the
+# organization's version, so an unchanged organization answers 304 or a cached
+# body without running the view. The organization loaded here stays in the
+# session, the view's own lookup of it does not query again. Views whose
+# response depends on the current day pass per_day=True, their ETag and cached
+# body change at midnight UTC as well
+def org_cached_response(view=None, *, per_day=False):
+    if view is None:
+        return partial(org_cached_response, per_day=per_day)
+
+    @wraps(view)
+    def wrapper(org_id, **kwargs):
+        organization = db.session.get(Organization, org_id)
+        if not organization:
+            return jsonify({"message": "Organization not found"}), 404
+
+        key = (
+            request.endpoint,
+            org_id,
+            organization.version,
+            urlencode(sorted(request.args.items(multi=True))),
+            utcnow().date().isoformat() if per_day else None,
+        )
+        etag = hashlib.sha1(repr(key).encode()).hexdigest()
+
+        if request.if_none_match.contains(etag):
+            response = current_app.response_class(status=304)
+            response.set_etag(etag)
+            return response
+
+        cached = org_response_cache.get(key)
+        if cached is None:
+            response = current_app.make_response(view(org_id, **kwargs))
+            if response.status_code != 200:
+                return response
+
+            headers = [
+                (name, value)
+                for name, value in response.headers
+                if name not in ("Content-Type", "Content-Length")
+            ]
+            cached = (response.get_data(), headers)
+            org_response_cache.set(key, cached)
+
+        body, headers = cached
+        response = current_app.response_class(
+            body, headers=headers, mimetype="application/json"
+        )
+        response.set_etag(etag)
+        return response
+
+    return wrapper
+
+
+# GET views that only read send their queries to the read replica when
+# REPLICA_DATABASE_URL is configured. Must be the outermost decorator after
+# the route, so the user lookup of @jwt_required reads from the replica too
+def replica_reads(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        db.session.info["replica_reads"] = True
+        return view(*args, **kwargs)
+
+    return wrapper
+
+
+# answers 403 unless the caller has one of roles in the organization the
+# request targets, the view finds the role in g.org_role. Roles are cached per
+# process along with the organization's membership_version, a hit only needs
+# the organization row, which stays in the session for the view's own lookup.
+# organization(**view_args) returns the id of the target organization. Goes
+# below @jwt_required
+def require_org_role(*roles, organization=None):
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            org_id = (organization or organization_from_url)(**kwargs)
+            if org_id is None:
+                return jsonify({"message": "org_id is required"}), 400
+
+            org = db.session.get(Organization, org_id)
+            if not org:
+                return jsonify({"message": "Organization not found"}), 404
+
+            user_id = get_current_user().id
+            cached = membership_cache.get((user_id, org.id))
+            if cached is not None and cached[0] == org.membership_version:
+                role = cached[1]
+            else:
+                role = get_org_role(user_id, org.id)
+                membership_cache.set((user_id, org.id), (org.membership_version, role))
+
+            if role not in roles:
+                return (
+                    jsonify(
+                        {
+                            "message": "This action requires the %s role"
+                            % " or ".join(roles)
+                        }
+                    ),
+                    403,
+                )
+
+            g.org_role = role
+            return view(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def organization_from_url(org_id, **kwargs):
+    return org_id
+
+
+# org_id of the JSON body or of the query string
+def organization_from_request(**kwargs):
+    data = request.get_json(silent=True)
+    org_id = data.get("org_id") if isinstance(data, dict) else None
+    if org_id is None:
+        org_id = request.args.get("org_id")
+    try:
+        return int(org_id)
+    except (TypeError, ValueError):
+        return None
+
+
+# the task is locked until commit so concurrent requests cannot count it
+# twice. It is loaded here along with its organization and handed to the view
+# in g.task
+def organization_from_task(task_id, **kwargs):
+    task = db.session.execute(
+        select(Task)
+        .options(joinedload(Task.organization))
+        .where(Task.id == task_id)
+        .with_for_update(of=Task)
+    ).scalar_one_or_none()
+    if not task:
+        abort(make_response(jsonify({"error": "Task not found"}), 404))
+    g.task = task
+    return task.organization_id
+
+
+# guards the /debug endpoints, they only exist when DEBUG_TOKEN is configured
+def debug_token_required(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        token = current_app.config["DEBUG_TOKEN"]
+        if not token:
+            abort(404)
+        if not hmac.compare_digest(request.headers.get("X-Debug-Token", ""), token):
+            return jsonify({"message": "Invalid debug token"}), 403
+        return view(*args, **kwargs)
+
+    return wrapper
+
+
+@bp.app_errorhandler(HashingPoolBusy)
+def handle_hashing_pool_busy(error):
+    return (
+        jsonify({"message": "Server is busy, please try again"}),
+        503,
+        {"Retry-After": str(current_app.config["PASSWORD_HASH_RETRY_AFTER"])},
+    )
+
+
+# stores a password hash computed with the current PASSWORD_HASH_METHOD,
+# unless the password changed since the old hash was read. Runs on the password
+# hasher's writer thread, outside of the request
+def store_rehashed_password(app, user_id, email, old_hash, new_hash):
+    with app.app_context():
+        db.session.execute(
+            update(User)
+            .where(User.id == user_id, User.password == old_hash)
+            .values(password=new_hash)
+        )
+        db.session.commit()
+        user_cache.delete(email)
+
+
+@bp.route("/signup", methods=["POST"])
 def signup():
     data = request.get_json()
-    hashed_password = generate_password_hash(data["password"], method="pbkdf2:sha256")
+    hashed_password = password_hasher.hash(data["password"])
     new_user = User(email=data["email"], password=hashed_password)  # Modified here
     db.session.add(new_user)
     db.session.commit()
     return jsonify({"message": "User created!"}), 201
 
 
-@app.route("/signin", methods=["POST"])
+@bp.route("/signin", methods=["POST"])
 def signin():
     data = request.get_json()
     user = User.query.filter_by(email=data["email"]).first()  # Modified here
@@ -187,92 +1161,180 @@ def signin():
     print("Req data =>", data)
     print("DB query user", user)
 
-    if not user or not check_password_hash(user.password, data["password"]):
+    if not user or not password_hasher.verify(user.password, data["password"]):
         return jsonify({"message": "Invalid credentials!"}), 401
+
+    if password_hasher.needs_rehash(user.password):
+        app = current_app._get_current_object()
+        user_id, email, old_hash = user.id, user.email, user.password
+        password_hasher.rehash_in_background(
+            data["password"],
+            lambda new_hash: store_rehashed_password(
+                app, user_id, email, old_hash, new_hash
+            ),
+        )
+
     access_token = create_access_token(identity=user.email)
-    return jsonify({"access_token": access_token})
+    refresh_token = create_refresh_token(identity=user.email)
+    return jsonify({"access_token": access_token, "refresh_token": refresh_token})
+
+
+# a new access token for a refresh token sent as the bearer token
+@bp.route("/refresh", methods=["POST"])
+@jwt_required(refresh=True)
+def refresh():
+    return jsonify({"access_token": create_access_token(identity=get_jwt_identity())})
+
+
+# revokes the bearer token (access or refresh) and the refresh token in the
+# body, if one is sent
+@bp.route("/logout", methods=["POST"])
+@jwt_required(verify_type=False)
+def logout():
+    user = get_current_user()
+    tokens = [get_jwt()]
+
+    refresh_token = (request.get_json(silent=True) or {}).get("refresh_token")
+    if refresh_token:
+        try:
+            refresh_data = decode_token(refresh_token)
+        except (JWTExtendedException, PyJWTError):
+            refresh_data = None
+        # expired or invalid refresh tokens cannot be used anyway
+        identity_claim = current_app.config["JWT_IDENTITY_CLAIM"]
+        if refresh_data and refresh_data[identity_claim] == get_jwt_identity():
+            tokens.append(refresh_data)
+
+    for jwt_data in tokens:
+        revoke_token(jwt_data, user.id)
+    db.session.commit()
+
+    for jwt_data in tokens:
+        token_blocklist.add(jwt_data["jti"])
 
+    return jsonify({"message": "Signed out"}), 200
 
-@app.route("/user", methods=["GET"])
+
+@bp.route("/user", methods=["GET"])
 @jwt_required()
 def get_user_data():
-    current_user_email = get_jwt_identity()
-    user: User = User.query.filter_by(email=current_user_email).first()
-
-    if not user:
-        return jsonify({"message": "User not found"}), 404
+    user: User = get_current_user()
 
     return jsonify(user.serialize())
 
 
-@app.route("/user/organizations", methods=["GET"])
+@bp.route("/user/organizations", methods=["GET"])
 @jwt_required()
 def get_user_organizations():
-    current_user_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_user_email).first()
+    user = get_current_user()
 
-    if not user:
-        return jsonify({"message": "User not found"}), 404
+    organizations_owning = owned_organizations_query(user.id).all()
+    organizations = working_organizations_query(user.id).all()
 
-    organizations_owning = [org.serialize() for org in user.organizations_owning]
-    organizations = Organization.query.filter(
-        or_(Organization.admins.any(id=user.id), Organization.employees.any(id=user.id))
-    ).all()
-    organizations_data = [org.serialize() for org in organizations]
+    serialized = serialize_organizations(organizations_owning + organizations)
 
     return jsonify(
         {
-            "organizations_owning": organizations_owning,
-            "organizations_working": organizations_data,
+            "organizations_owning": serialized[: len(organizations_owning)],
+            "organizations_working": serialized[len(organizations_owning) :],
         }
     )
 
 
-@app.route("/users", methods=["GET"])
+@bp.route("/users", methods=["GET"])
+@replica_reads
 def get_users_by_ids():
-    user_ids_param = request.args.get("user_ids")
-    user_ids = list(map(int, user_ids_param.split(",")))
+    user_ids_param = request.args.get("user_ids", "")
+    try:
+        user_ids = [int(user_id) for user_id in user_ids_param.split(",")]
+    except ValueError:
+        return (
+            jsonify({"error": "user_ids must be a comma separated list of ids."}),
+            400,
+        )
 
-    users = User.query.filter(User.id.in_(user_ids)).all()
+    # duplicates are dropped, keeping the order of first appearance
+    user_ids = list(dict.fromkeys(user_ids))
+    if len(user_ids) > current_app.config["MAX_USER_IDS"]:
+        return (
+            jsonify(
+                {
+                    "error": "At most %d user ids can be requested at once."
+                    % current_app.config["MAX_USER_IDS"]
+                }
+            ),
+            400,
+        )
 
-    serialized_users = [user.serialize() for user in users]
-    return jsonify(serialized_users)
+    return jsonify(serialize_users(user_ids))
 
 
-@app.route("/users/<int:user_id>/invitations", methods=["GET"])
+# invitation autocomplete: users matching an email prefix who are not in the
+# organization and not invited to it yet, for its owners and admins
+@bp.route("/users/search", methods=["GET"])
+@jwt_required()
+@require_org_role("owner", "admin", organization=organization_from_request)
+def search_users():
+    prefix = request.args.get("q", "").strip().lower()
+    if len(prefix) < current_app.config["USER_SEARCH_MIN_PREFIX"]:
+        return (
+            jsonify(
+                {
+                    "message": "q must be at least %d characters long"
+                    % current_app.config["USER_SEARCH_MIN_PREFIX"]
+                }
+            ),
+            400,
+        )
+
+    try:
+        org_id = int(request.args["org_id"])
+        limit = int(
+            request.args.get("limit", current_app.config["USER_SEARCH_DEFAULT_LIMIT"])
+        )
+    except (KeyError, ValueError):
+        return jsonify({"message": "org_id and limit must be integers"}), 400
+    if limit < 1 or limit > current_app.config["USER_SEARCH_MAX_LIMIT"]:
+        return (
+            jsonify(
+                {
+                    "message": "limit must be between 1 and %d"
+                    % current_app.config["USER_SEARCH_MAX_LIMIT"]
+                }
+            ),
+            400,
+        )
+
+    # the caller and their role were read from the primary, so that a new
+    # account or a fresh promotion is never checked against a lagging replica.
+    # Only the search itself may read from the replica
+    db.session.info["replica_reads"] = True
+    users = db.session.execute(user_search_statement(prefix, org_id, limit)).all()
+    return jsonify([{"id": user.id, "email": user.email} for user in users])
+
+
+@bp.route("/users/<int:user_id>/invitations", methods=["GET"])
+@replica_reads
 def get_user_invitations(user_id):
     user = User.query.get(user_id)
 
     if not user:
         return jsonify({"message": "User not found"}), 404
 
-    invitations = (
-        db.session.query(pending_invitations)
-        .filter(pending_invitations.c.user_id == user_id)
-        .join(Organization, pending_invitations.c.organization_id == Organization.id)
-        .with_entities(
-            Organization.id,
-            Organization.name,
-            pending_invitations.c.status,
-            pending_invitations.c.user_response,
-        )
-        .all()
+    return paginated_response(
+        user_invitations_query(user_id),
+        pending_invitations.c.organization_id,
+        lambda invitation: invitation.id,
+        lambda invitation: {
+            "organization_id": invitation.id,
+            "organization_name": invitation.name,
+            "status": invitation.status,
+            "user_response": invitation.user_response,
+        },
     )
 
-    serialized_invitations = [
-        {
-            "organization_id": organization_id,
-            "organization_name": organization_name,
-            "status": status,
-            "user_response": user_response,
-        }
-        for organization_id, organization_name, status, user_response in invitations
-    ]
 
-    return jsonify(serialized_invitations)
-
-
-@app.route("/organizations", methods=["POST"])
+@bp.route("/organizations", methods=["POST"])
 @jwt_required()
 def add_organization():
     data = request.get_json()
@@ -281,11 +1343,7 @@ def add_organization():
     if not org_name:
         return jsonify({"message": "Organization name is required"}), 400
 
-    current_user_email = get_jwt_identity()
-    user = User.query.filter_by(email=current_user_email).first()
-
-    if not user:
-        return jsonify({"message": "User not found"}), 404
+    user = get_current_user()
 
     new_org = Organization(name=org_name)
 
@@ -305,18 +1363,14 @@ def add_organization():
     return jsonify({"message": "Organization added successfully"}), 201
 
 
-@app.route("/organizations/<int:org_id>", methods=["PUT"])
+@bp.route("/organizations/<int:org_id>", methods=["PUT"])
 @jwt_required()
+@require_org_role("owner")
 def update_organization(org_id):
     org = Organization.query.get(org_id)
     if not org:
         return jsonify({"error": "Organization not found"}), 404
 
-    user_email = get_jwt_identity()
-    user = User.query.filter_by(email=user_email).first()
-    if not user:
-        return jsonify({"error": "User not found"}), 404
-
     data = request.json
     new_name = data.get("name")
     new_owners = data.get("owners", [])
@@ -331,22 +1385,25 @@ def update_organization(org_id):
 
             owner = User.query.filter_by(email=owner_email).first()
             if owner:
-                if owner in org.admins:
-                    org.admins.remove(owner)
-                if owner in org.employees:
-                    org.employees.remove(owner)
+                remove_org_member(owner.id, org.id, "admin", "employee")
 
-                if owner not in org.owners:
-                    org.owners.append(owner)
+                if not has_org_role(owner.id, org.id, "owner"):
+                    add_org_member(owner.id, org.id, "owner")
+                    queue_org_event(
+                        org.id, "member.role_changed", user_id=owner.id, role="owner"
+                    )
             elif not owner:
                 return jsonify({"message": "User not found"}), 404
 
+    bump_organization_version(org.id, members=bool(new_owners))
+    queue_org_event(org.id, "organization.updated", name=org.name)
     db.session.commit()
     return jsonify({"message": "Organization updated successfully"}), 200
 
 
-@app.route("/organizations/<int:org_id>/invite", methods=["POST"])
+@bp.route("/organizations/<int:org_id>/invite", methods=["POST"])
 @jwt_required()
+@require_org_role("owner", "admin")
 def send_invitation(org_id):
     data = request.get_json()
     email = data.get("email", "")
@@ -362,62 +1419,157 @@ def send_invitation(org_id):
     if not user:
         return jsonify({"message": "User not found"}), 404
 
-    if (
-        user in organization.owners
-        or user in organization.admins
-        or user in organization.employees
-    ):
+    if get_org_role(user.id, organization.id):
         return (
             jsonify({"message": "User is already an employee of this organization"}),
             400,
         )
 
-    organization.pending_invitations.append(user)
+    db.session.execute(
+        pending_invitations.insert().values(
+            user_id=user.id, organization_id=organization.id
+        )
+    )
+    bump_organization_version(organization.id)
+    queue_org_event(organization.id, "invitation.sent", user_ids=[user.id])
     db.session.commit()
 
     return jsonify({"message": "Invitation sent successfully"}), 201
 
 
-@app.route("/organizations/<int:org_id>/accept-invitation", methods=["POST"])
+# invites many users at once: the users, existing members and existing
+# invitations are each looked up with one query and all new invitations are
+# inserted with a single statement in one transaction
+@bp.route("/organizations/<int:org_id>/invitations", methods=["POST"])
 @jwt_required()
-def accept_invitation(org_id):
-    user_email = get_jwt_identity()
-    user = User.query.filter_by(email=user_email).first()
+@require_org_role("owner", "admin")
+def send_invitations(org_id):
+    data = request.get_json()
+    emails = data.get("emails")
+
+    if not isinstance(emails, list) or not emails:
+        return jsonify({"message": "A list of emails is required"}), 400
+
+    if len(emails) > current_app.config["MAX_BULK_INVITATIONS"]:
+        return (
+            jsonify(
+                {
+                    "message": "At most %d emails can be invited at once"
+                    % current_app.config["MAX_BULK_INVITATIONS"]
+                }
+            ),
+            400,
+        )
 
     organization = Organization.query.get(org_id)
     if not organization:
         return jsonify({"message": "Organization not found"}), 404
 
-    if not user:
-        return jsonify({"message": "User not found"}), 404
+    valid_emails = {email for email in emails if isinstance(email, str) and email}
+    user_ids_by_email = dict(
+        db.session.execute(
+            select(User.email, User.id).where(User.email.in_(valid_emails))
+        ).all()
+    )
+    user_ids = set(user_ids_by_email.values())
+
+    member_ids = organization_member_ids(org_id, user_ids)
+    candidate_ids = user_ids - member_ids
+
+    # invitations that already exist, or that a concurrent request inserted
+    # first, are skipped by the insert instead of failing it
+    new_ids = set()
+    if candidate_ids:
+        dialect = (
+            postgresql if db.session.get_bind().dialect.name == "postgresql" else sqlite
+        )
+        new_ids = set(
+            db.session.execute(
+                dialect.insert(pending_invitations)
+                .values(
+                    [
+                        {"user_id": user_id, "organization_id": org_id}
+                        for user_id in sorted(candidate_ids)
+                    ]
+                )
+                .on_conflict_do_nothing(index_elements=["user_id", "organization_id"])
+                .returning(pending_invitations.c.user_id)
+            ).scalars()
+        )
+    invited_ids = candidate_ids - new_ids
+
+    if new_ids:
+        bump_organization_version(org_id)
+        queue_org_event(org_id, "invitation.sent", user_ids=sorted(new_ids))
+        db.session.commit()
+
+    results = []
+    seen = set()
+    for email in emails:
+        valid = isinstance(email, str) and email
+        user_id = user_ids_by_email.get(email) if valid else None
+
+        if not valid:
+            status = "invalid_email"
+        elif email in seen:
+            status = "duplicate"
+        elif user_id is None:
+            status = "user_not_found"
+        elif user_id in member_ids:
+            status = "already_member"
+        elif user_id in invited_ids:
+            status = "already_invited"
+        else:
+            status = "invited"
+
+        if valid:
+            seen.add(email)
+        results.append({"email": email, "user_id": user_id, "status": status})
+
+    return (
+        jsonify({"invited": len(new_ids), "results": results}),
+        201 if new_ids else 200,
+    )
+
+
+@bp.route("/organizations/<int:org_id>/accept-invitation", methods=["POST"])
+@jwt_required()
+def accept_invitation(org_id):
+    user = get_current_user()
+
+    organization = Organization.query.get(org_id)
+    if not organization:
+        return jsonify({"message": "Organization not found"}), 404
 
     user_id = user.id
 
-    if user_id in (
-        organization.employees or organization.owners or organization.admins
-    ):
+    if get_org_role(user_id, organization.id):
         return jsonify({"message": "User is already part of the organization"}), 403
 
     db.session.query(pending_invitations).filter(
         pending_invitations.c.organization_id == org_id,
         pending_invitations.c.user_id == user_id,
     ).update(
-        {pending_invitations.c.status: True, pending_invitations.c.user_response: True}
+        {
+            pending_invitations.c.status: True,
+            pending_invitations.c.user_response: True,
+            pending_invitations.c.responded_at: utcnow(),
+        }
     )
 
-    organization.employees.append(User.query.get(user_id))
+    add_org_member(user_id, organization.id, "employee")
+    bump_organization_version(organization.id, members=True)
+    queue_org_event(organization.id, "invitation.accepted", user_id=user_id)
 
     db.session.commit()
 
     return jsonify({"message": "Invitation accepted successfully"}), 200
 
 
-@app.route("/organizations/<int:org_id>/decline-invitation", methods=["POST"])
+@bp.route("/organizations/<int:org_id>/decline-invitation", methods=["POST"])
 @jwt_required()
 def decline_invitation(org_id):
-    user_email = get_jwt_identity()
-    user = User.query.filter_by(email=user_email).first()
-    user_id = user.id
+    user_id = get_current_user().id
 
     organization = Organization.query.get(org_id)
     if not organization:
@@ -438,60 +1590,101 @@ def decline_invitation(org_id):
     db.session.query(pending_invitations).filter(
         pending_invitations.c.organization_id == org_id,
         pending_invitations.c.user_id == user_id,
-    ).update({pending_invitations.c.user_response: False})
+    ).update(
+        {
+            pending_invitations.c.user_response: False,
+            pending_invitations.c.responded_at: utcnow(),
+        }
+    )
+    bump_organization_version(organization.id)
+    queue_org_event(organization.id, "invitation.declined", user_id=user_id)
 
     db.session.commit()
 
     return jsonify({"message": "Invitation declined successfully"}), 200
 
 
-@app.route("/organizations/<int:org_id>/invitations", methods=["GET"])
+@bp.route("/organizations/<int:org_id>/invitations", methods=["GET"])
+@replica_reads
+@org_cached_response
 def get_organization_invitations(org_id):
     organization = Organization.query.get(org_id)
 
     if not organization:
         return jsonify({"message": "Organization not found"}), 404
 
-    invitations = (
-        db.session.query(pending_invitations)
-        .filter(pending_invitations.c.organization_id == org_id)
-        .join(User, pending_invitations.c.user_id == User.id)
-        .with_entities(
-            User.id,
-            User.email,
-            pending_invitations.c.status,
-            pending_invitations.c.user_response,
-        )
-        .all()
+    return paginated_response(
+        organization_invitations_query(org_id),
+        pending_invitations.c.user_id,
+        lambda invitation: invitation.id,
+        serialize_organization_invitation,
     )
 
-    serialized_invitations = [
-        {
-            "user_id": user_id,
-            "user_email": user_email,
-            "status": status,
-            "user_response": user_response,
-        }
-        for user_id, user_email, status, user_response in invitations
-    ]
 
-    return jsonify(serialized_invitations)
-
-
-@app.route("/organization/<int:org_id>", methods=["GET"])
+@bp.route("/organization/<int:org_id>", methods=["GET"])
+@replica_reads
+@org_cached_response
 def get_organization(org_id):
     organization = Organization.query.get(org_id)
 
     if not organization:
         return jsonify({"message": "Organization not found"}), 404
 
-    return jsonify(organization.serialize())
+    return jsonify(serialize_organizations([organization])[0])
+
+
+# everything the organization page needs in one request: the organization with
+# its members, invitations, the first tasks and the caller's role
+@bp.route("/organizations/<int:org_id>/dashboard", methods=["GET"])
+@jwt_required()
+def get_organization_dashboard(org_id):
+    user = get_current_user()
+
+    organization = Organization.query.get(org_id)
+    if not organization:
+        return jsonify({"message": "Organization not found"}), 404
+
+    organization_data = serialize_organizations([organization])[0]
+
+    role = None
+    for candidate in ROLE_TABLES:
+        members = organization_data[role_members_key(candidate)]
+        if any(member["id"] == user.id for member in members):
+            role = candidate
+            break
 
+    max_rows = current_app.config["UNPAGINATED_MAX_ROWS"]
+    invitations = (
+        organization_invitations_query(org_id)
+        .order_by(pending_invitations.c.user_id)
+        .limit(max_rows)
+        .all()
+    )
+    tasks = organization_tasks_query(org_id).order_by(Task.id).limit(max_rows + 1).all()
 
-@app.route("/delete-pending-invitation", methods=["DELETE"])
+    return jsonify(
+        {
+            "organization": organization_data,
+            "invitations": [
+                serialize_organization_invitation(invitation)
+                for invitation in invitations
+            ],
+            "tasks": [task.serialize() for task in tasks[:max_rows]],
+            "tasks_next_cursor": (
+                encode_cursor(tasks[max_rows - 1].id) if len(tasks) > max_rows else None
+            ),
+            "user": {"id": user.id, "email": user.email},
+            "role": role,
+        }
+    )
+
+
+@bp.route("/delete-pending-invitation", methods=["DELETE"])
+@jwt_required()
+@require_org_role("owner", organization=organization_from_request)
 def delete_pending_invitation():
-    user_id = request.args.get("user_id")
-    org_id = request.args.get("org_id")
+    user_id = request.args.get("user_id", type=int)
+    org_id = request.args.get("org_id", type=int)
 
     if user_id is None or org_id is None:
         return jsonify({"error": "Both user_id and org_id are required."}), 400
@@ -503,13 +1696,17 @@ def delete_pending_invitation():
     )
 
     db.session.execute(delete_statement)
+    bump_organization_version(org_id)
+    queue_org_event(org_id, "invitation.deleted", user_id=user_id)
 
     db.session.commit()
 
     return jsonify({"message": "Pending invitation deleted successfully"}), 200
 
 
-@app.route("/move-employee-to-admin", methods=["POST"])
+@bp.route("/move-employee-to-admin", methods=["POST"])
+@jwt_required()
+@require_org_role("owner", organization=organization_from_request)
 def move_employee_to_admin():
     user_id = request.json.get("user_id")
     org_id = request.json.get("org_id")
@@ -525,9 +1722,12 @@ def move_employee_to_admin():
     if user is None:
         return jsonify({"error": "User not found."}), 404
 
-    if user in organization.employees:
-        organization.employees.remove(user)
-        organization.admins.append(user)
+    if remove_org_member(user.id, organization.id, "employee"):
+        add_org_member(user.id, organization.id, "admin")
+        bump_organization_version(organization.id, members=True)
+        queue_org_event(
+            organization.id, "member.role_changed", user_id=user.id, role="admin"
+        )
         db.session.commit()
         return (
             jsonify({"message": "User moved from employees to admins successfully"}),
@@ -537,7 +1737,9 @@ def move_employee_to_admin():
         return jsonify({"error": "User not found in employees."}), 404
 
 
-@app.route("/move-admin-to-employee", methods=["POST"])
+@bp.route("/move-admin-to-employee", methods=["POST"])
+@jwt_required()
+@require_org_role("owner", organization=organization_from_request)
 def move_admin_to_employee():
     user_id = request.json.get("user_id")
     org_id = request.json.get("org_id")
@@ -555,9 +1757,12 @@ def move_admin_to_employee():
     if user is None:
         return jsonify({"error": "User not found."}), 404
 
-    if user in organization.admins:
-        organization.admins.remove(user)
-        organization.employees.append(user)
+    if remove_org_member(user.id, organization.id, "admin"):
+        add_org_member(user.id, organization.id, "employee")
+        bump_organization_version(organization.id, members=True)
+        queue_org_event(
+            organization.id, "member.role_changed", user_id=user.id, role="employee"
+        )
         db.session.commit()
         return (
             jsonify({"message": "User moved from admins to employees successfully"}),
@@ -567,7 +1772,9 @@ def move_admin_to_employee():
         return jsonify({"error": "User not found in admins."}), 404
 
 
-@app.route("/remove-employee", methods=["DELETE"])
+@bp.route("/remove-employee", methods=["DELETE"])
+@jwt_required()
+@require_org_role("owner", organization=organization_from_request)
 def remove_employee():
     user_id = request.args.get("user_id")
     org_id = request.args.get("org_id")
@@ -585,15 +1792,18 @@ def remove_employee():
     if not employee:
         return jsonify({"error": "Employee not found."}), 404
 
-    if employee in organization.employees:
-        organization.employees.remove(employee)
+    if remove_org_member(employee.id, organization.id, "employee"):
+        bump_organization_version(organization.id, members=True)
+        queue_org_event(organization.id, "member.removed", user_id=employee.id)
         db.session.commit()
         return jsonify({"message": "Employee removed from employees list."}), 200
     else:
         return jsonify({"error": "Employee is not in the employees list."}), 404
 
 
-@app.route("/remove-admin", methods=["DELETE"])
+@bp.route("/remove-admin", methods=["DELETE"])
+@jwt_required()
+@require_org_role("owner", organization=organization_from_request)
 def remove_admin():
     user_id = request.args.get("user_id")
     org_id = request.args.get("org_id")
@@ -611,15 +1821,18 @@ def remove_admin():
     if not admin:
         return jsonify({"error": "Admin not found."}), 404
 
-    if admin in organization.admins:
-        organization.admins.remove(admin)
+    if remove_org_member(admin.id, organization.id, "admin"):
+        bump_organization_version(organization.id, members=True)
+        queue_org_event(organization.id, "member.removed", user_id=admin.id)
         db.session.commit()
         return jsonify({"message": "Admin removed from admins list."}), 200
     else:
         return jsonify({"error": "Admin is not in the admins list."}), 404
 
 
-@app.route("/organizations/<int:org_id>/tasks", methods=["POST"])
+@bp.route("/organizations/<int:org_id>/tasks", methods=["POST"])
+@jwt_required()
+@require_org_role("owner", "admin")
 def add_task_to_organization(org_id):
     task_data = request.get_json()
     title = task_data.get("title")
@@ -633,64 +1846,416 @@ def add_task_to_organization(org_id):
     if not organization:
         return jsonify({"error": "Organization not found."}), 404
 
-    new_task = Task(title=title, description=description, organization=organization)
-
-    organization.tasks.append(new_task)
+    # added by organization_id, appending to organization.tasks would load
+    # every task of the organization first
+    new_task = Task(
+        title=title, description=description, organization_id=organization.id
+    )
+    db.session.add(new_task)
+    db.session.flush()
+    bump_organization_version(organization.id, tasks=1)
+    queue_org_event(organization.id, "task.added", task=new_task.serialize())
 
     db.session.commit()
 
     return jsonify({"message": "Task added to the organization successfully"}), 201
 
 
-@app.route("/organizations/<int:org_id>/tasks", methods=["GET"])
+@bp.route("/organizations/<int:org_id>/tasks", methods=["GET"])
+@replica_reads
+@org_cached_response
 def get_organization_tasks(org_id):
     organization = Organization.query.get(org_id)
 
     if not organization:
         return jsonify({"message": "Organization not found"}), 404
 
-    tasks = Task.query.filter_by(organization_id=org_id).all()
+    query, order = filter_organization_tasks(organization_tasks_query(org_id))
+    return paginated_response(
+        query,
+        order,
+        order.key,
+        lambda task: task.serialize(),
+    )
+
 
-    serialized_tasks = [
+# task totals and completions per user and per day over the last ?days=
+# (default 30, at most 366) days. Totals are read from the organization row,
+# the breakdowns from task_completion_stats, neither counts tasks
+@bp.route("/organizations/<int:org_id>/tasks/stats", methods=["GET"])
+@replica_reads
+@org_cached_response(per_day=True)
+def get_organization_task_stats(org_id):
+    organization = Organization.query.get(org_id)
+
+    if not organization:
+        return jsonify({"message": "Organization not found"}), 404
+
+    days = request.args.get("days", 30, type=int)
+    if not 1 <= days <= 366:
+        return jsonify({"error": "days must be between 1 and 366."}), 400
+
+    completed = func.sum(task_completion_stats.c.completed)
+    by_user = db.session.execute(
+        select(task_completion_stats.c.user_id, User.email, completed)
+        .join(User, User.id == task_completion_stats.c.user_id)
+        .where(task_completion_stats.c.organization_id == org_id)
+        .group_by(task_completion_stats.c.user_id, User.email)
+        .having(completed > 0)
+        .order_by(completed.desc(), task_completion_stats.c.user_id)
+    ).all()
+    by_day = db.session.execute(
+        select(task_completion_stats.c.day, completed)
+        .where(
+            task_completion_stats.c.organization_id == org_id,
+            task_completion_stats.c.day > utcnow().date() - timedelta(days=days),
+        )
+        .group_by(task_completion_stats.c.day)
+        .having(completed > 0)
+        .order_by(task_completion_stats.c.day)
+    ).all()
+
+    return jsonify(
         {
-            "id": task.id,
-            "title": task.title,
-            "description": task.description,
-            "completed": task.completed,
-            "completed_by": task.completed_by,
-            "completed_by_email": task.completed_by_email,
-            "completed_at": task.completed_at,
+            "organization_id": org_id,
+            "total": organization.task_count,
+            "completed": organization.completed_task_count,
+            "open": organization.task_count - organization.completed_task_count,
+            "completed_by_user": [
+                {"user_id": user_id, "email": email, "completed": count}
+                for user_id, email, count in by_user
+            ],
+            "completed_per_day": [
+                {"day": day.isoformat(), "completed": count} for day, count in by_day
+            ],
         }
-        for task in tasks
+    )
+
+
+TASK_EXPORT_COLUMNS = (
+    "id",
+    "title",
+    "description",
+    "completed",
+    "completed_by",
+    "completed_by_email",
+    "completed_at",
+)
+
+
+# streams every task of the organization as NDJSON or CSV. Rows are read from a
+# server side cursor in batches of EXPORT_BATCH_SIZE and written out one at a
+# time, so memory use does not depend on the number of tasks
+@bp.route("/organizations/<int:org_id>/tasks/export", methods=["GET"])
+@replica_reads
+def export_organization_tasks(org_id):
+    export_format = request.args.get("format", "ndjson")
+    if export_format not in ("ndjson", "csv"):
+        return jsonify({"message": "format must be ndjson or csv"}), 400
+
+    organization = Organization.query.get(org_id)
+    if not organization:
+        return jsonify({"message": "Organization not found"}), 404
+
+    statement = (
+        select(*[getattr(Task, column) for column in TASK_EXPORT_COLUMNS])
+        .where(Task.organization_id == org_id)
+        .order_by(Task.id)
+        .execution_options(yield_per=current_app.config["EXPORT_BATCH_SIZE"])
+    )
+
+    def rows():
+        for row in db.session.execute(statement):
+            row = row._asdict()
+            if row["completed_at"] is not None:
+                row["completed_at"] = row["completed_at"].isoformat()
+            yield row
+
+    def ndjson():
+        for row in rows():
+            yield current_app.json.dumps(row) + "\n"
+
+    def csv_lines():
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=TASK_EXPORT_COLUMNS)
+        writer.writeheader()
+        for row in rows():
+            writer.writerow(row)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+
+    return Response(
+        stream_with_context(ndjson() if export_format == "ndjson" else csv_lines()),
+        mimetype="application/x-ndjson" if export_format == "ndjson" else "text/csv",
+        headers={
+            "Content-Disposition": 'attachment; filename="organization-%d-tasks.%s"'
+            % (org_id, export_format)
+        },
+    )
+
+
+# applies a list of task operations in one transaction:
+#   {"op": "create", "title": ..., "description": ...}
+#   {"op": "complete", "task_id": ..., "date": ...}
+#   {"op": "uncheck", "task_id": ...}
+#   {"op": "delete", "task_id": ...}
+# Operations of the same kind run as a single INSERT/UPDATE/DELETE. With
+# "atomic": true nothing is applied unless every operation succeeds
+@bp.route("/organizations/<int:org_id>/tasks/batch", methods=["POST"])
+@jwt_required()
+@require_org_role("owner")
+def batch_update_tasks(org_id):
+    data = request.get_json()
+    operations = data.get("operations")
+    atomic = bool(data.get("atomic", False))
+
+    if not isinstance(operations, list) or not operations:
+        return jsonify({"error": "A list of operations is required."}), 400
+
+    if len(operations) > current_app.config["MAX_BATCH_TASK_OPERATIONS"]:
+        return (
+            jsonify(
+                {
+                    "error": "At most %d operations can be sent at once."
+                    % current_app.config["MAX_BATCH_TASK_OPERATIONS"]
+                }
+            ),
+            400,
+        )
+
+    organization = Organization.query.get(org_id)
+    if not organization:
+        return jsonify({"error": "Organization not found."}), 404
+
+    user = get_current_user()
+
+    task_ids = {
+        operation.get("task_id")
+        for operation in operations
+        if isinstance(operation, dict) and isinstance(operation.get("task_id"), int)
+    }
+    # locked until commit, unchecking relies on the completion read here
+    tasks = {
+        row.id: row
+        for row in db.session.execute(
+            select(Task.id, Task.completed, Task.completed_by, Task.completed_at)
+            .where(Task.organization_id == org_id, Task.id.in_(task_ids))
+            .with_for_update()
+        )
+    }
+
+    results = []
+    creates = []
+    completions = {}
+    unchecks = []
+    deletes = []
+    seen_task_ids = set()
+
+    for index, operation in enumerate(operations):
+        op = operation.get("op") if isinstance(operation, dict) else None
+        task_id = operation.get("task_id") if isinstance(operation, dict) else None
+        completed_at = (
+            parse_completion_date(operation.get("date")) if op == "complete" else None
+        )
+        result = {"index": index, "op": op, "task_id": task_id}
+        results.append(result)
+
+        if op == "create":
+            if not operation.get("title") or not operation.get("description"):
+                result["status"] = "invalid"
+                result["error"] = "Both title and description are required."
+                continue
+            result["status"] = "created"
+            creates.append((result, operation["title"], operation["description"]))
+            continue
+
+        if op not in ("complete", "uncheck", "delete"):
+            result["status"] = "invalid"
+            result["error"] = "Unknown operation."
+            continue
+
+        if not isinstance(task_id, int):
+            result["status"] = "invalid"
+            result["error"] = "task_id is required."
+        elif op == "complete" and completed_at is None:
+            result["status"] = "invalid"
+            result["error"] = "A valid date is required."
+        elif task_id not in tasks:
+            result["status"] = "not_found"
+        elif task_id in seen_task_ids:
+            result["status"] = "duplicate_task"
+        elif op == "complete" and tasks[task_id].completed:
+            result["status"] = "already_completed"
+        elif op == "uncheck" and not tasks[task_id].completed:
+            result["status"] = "not_completed"
+        elif op == "complete":
+            result["status"] = "completed"
+            completions.setdefault(completed_at, []).append(result)
+        elif op == "uncheck":
+            result["status"] = "unchecked"
+            unchecks.append(result)
+        else:
+            result["status"] = "deleted"
+            deletes.append(result)
+
+        if isinstance(task_id, int):
+            seen_task_ids.add(task_id)
+
+    applied = [
+        result
+        for result in results
+        if result["status"] in ("created", "completed", "unchecked", "deleted")
     ]
+    if atomic and len(applied) != len(results):
+        for result in applied:
+            result["status"] = "not_applied"
+        return jsonify({"applied": False, "results": results}), 409
+
+    # the guarded statements only return the rows they changed, anything
+    # changed by a concurrent request in the meantime is reported as a conflict
+    changed_ids = set()
+    # (user_id, completed_at, delta) for task_completion_stats
+    stats_changes = []
+    completed_delta = 0
+
+    for completed_at, date_results in completions.items():
+        completed_ids = db.session.scalars(
+            update(Task)
+            .where(
+                Task.id.in_([result["task_id"] for result in date_results]),
+                Task.completed.isnot(True),
+            )
+            .values(
+                completed=True,
+                completed_by=user.id,
+                completed_by_email=user.email,
+                completed_at=completed_at,
+            )
+            .returning(Task.id)
+            .execution_options(synchronize_session=False)
+        ).all()
+        changed_ids.update(completed_ids)
+        completed_delta += len(completed_ids)
+        stats_changes.extend((user.id, completed_at, 1) for _ in completed_ids)
+
+    if unchecks:
+        unchecked_ids = db.session.scalars(
+            update(Task)
+            .where(
+                Task.id.in_([result["task_id"] for result in unchecks]),
+                Task.completed.is_(True),
+            )
+            .values(
+                completed=False,
+                completed_by=None,
+                completed_by_email=None,
+                completed_at=None,
+            )
+            .returning(Task.id)
+            .execution_options(synchronize_session=False)
+        ).all()
+        changed_ids.update(unchecked_ids)
+        completed_delta -= len(unchecked_ids)
+        stats_changes.extend(
+            (tasks[task_id].completed_by, tasks[task_id].completed_at, -1)
+            for task_id in unchecked_ids
+        )
+
+    deleted_count = 0
+    if deletes:
+        deleted = db.session.execute(
+            delete(Task)
+            .where(Task.id.in_([result["task_id"] for result in deletes]))
+            .returning(Task.id, Task.completed, Task.completed_by, Task.completed_at)
+            .execution_options(synchronize_session=False)
+        ).all()
+        changed_ids.update(row.id for row in deleted)
+        deleted_count = len(deleted)
+        for row in deleted:
+            if row.completed:
+                completed_delta -= 1
+                stats_changes.append((row.completed_by, row.completed_at, -1))
+
+    for result in applied:
+        if result["op"] != "create" and result["task_id"] not in changed_ids:
+            result["status"] = "conflict"
+
+    if atomic and any(result["status"] == "conflict" for result in results):
+        db.session.rollback()
+        for result in results:
+            if result["status"] != "conflict":
+                result["status"] = "not_applied"
+        return jsonify({"applied": False, "results": results}), 409
+
+    if creates:
+        created_ids = db.session.scalars(
+            insert(Task).returning(Task.id, sort_by_parameter_order=True),
+            [
+                {"title": title, "description": description, "organization_id": org_id}
+                for _, title, description in creates
+            ],
+        ).all()
+        for (result, _, _), task_id in zip(creates, created_ids):
+            result["task_id"] = task_id
+
+    if creates or changed_ids:
+        bump_organization_version(
+            org_id,
+            tasks=len(creates) - deleted_count,
+            completed_tasks=completed_delta,
+        )
+        record_task_completions(org_id, stats_changes)
+        queue_org_event(
+            org_id,
+            "tasks.changed",
+            **{
+                status: [
+                    result["task_id"]
+                    for result in applied
+                    if result["status"] == status
+                ]
+                for status in ("created", "completed", "unchecked", "deleted")
+            },
+        )
+    db.session.commit()
 
-    return jsonify(serialized_tasks)
+    return jsonify({"applied": True, "results": results}), 200
 
 
-@app.route("/complete-task/<int:task_id>", methods=["PUT"])
+@bp.route("/complete-task/<int:task_id>", methods=["PUT"])
 @jwt_required()
+@require_org_role("owner", "admin", organization=organization_from_task)
 def update_task(task_id):
-    user_email = get_jwt_identity()
-    if not user_email:
-        return jsonify({"error": "User not found"}), 404
+    # loaded and locked by require_org_role
+    task = g.task
 
-    task = Task.query.get(task_id)
-    if not task:
-        return jsonify({"error": "Task not found"}), 404
-
-    user = User.query.filter_by(email=user_email).first()
-    if not user:
-        return jsonify({"error": "User not found"}), 404
+    user = get_current_user()
 
     data = request.json
     if "date" in data:
         if task.completed:
             return jsonify({"error": "Task is already completed"}), 400
 
+        completed_at = parse_completion_date(data["date"])
+        if completed_at is None:
+            return jsonify({"error": "Invalid date"}), 400
+
         task.completed = True
         task.completed_by = user.id
-        task.completed_by_email = user_email
-        task.completed_at = data["date"]
+        task.completed_by_email = user.email
+        task.completed_at = completed_at
+        bump_organization_version(task.organization_id, completed_tasks=1)
+        record_task_completions(task.organization_id, [(user.id, completed_at, 1)])
+        queue_org_event(
+            task.organization_id,
+            "task.completed",
+            task_id=task.id,
+            completed_by=user.id,
+            completed_by_email=user.email,
+            completed_at=completed_at,
+        )
 
         db.session.commit()
         return jsonify({"message": "Task marked as completed"}), 200
@@ -698,17 +2263,23 @@ def update_task(task_id):
         return jsonify({"error": "Invalid data format"}), 400
 
 
-@app.route("/uncheck-task/<int:task_id>", methods=["PUT"])
+@bp.route("/uncheck-task/<int:task_id>", methods=["PUT"])
+@jwt_required()
+@require_org_role("owner", organization=organization_from_task)
 def uncheck_task(task_id):
-    task = Task.query.get(task_id)
-    if not task:
-        return jsonify({"error": "Task not found"}), 404
+    # loaded and locked by require_org_role
+    task = g.task
 
     if task.completed:
+        record_task_completions(
+            task.organization_id, [(task.completed_by, task.completed_at, -1)]
+        )
         task.completed = False
         task.completed_by = None
         task.completed_at = None
         task.completed_by_email = None
+        bump_organization_version(task.organization_id, completed_tasks=-1)
+        queue_org_event(task.organization_id, "task.unchecked", task_id=task.id)
 
         db.session.commit()
         return jsonify({"message": "Task marked as not completed"}), 200
@@ -716,17 +2287,461 @@ def uncheck_task(task_id):
         return jsonify({"error": "Task is not completed"}), 400
 
 
-@app.route("/delete-task/<int:task_id>", methods=["DELETE"])
+@bp.route("/delete-task/<int:task_id>", methods=["DELETE"])
+@jwt_required()
+@require_org_role("owner", organization=organization_from_task)
 def delete_task(task_id):
-    task = Task.query.get(task_id)
-    if not task:
-        return jsonify({"error": "Task not found"}), 404
+    # loaded and locked by require_org_role
+    task = g.task
 
     db.session.delete(task)
+    if task.completed:
+        record_task_completions(
+            task.organization_id, [(task.completed_by, task.completed_at, -1)]
+        )
+    bump_organization_version(
+        task.organization_id, tasks=-1, completed_tasks=-1 if task.completed else 0
+    )
+    queue_org_event(task.organization_id, "task.deleted", task_id=task.id)
     db.session.commit()
 
     return jsonify({"message": "Task deleted successfully"}), 200
 
 
+# Server-Sent Events stream of the organization's task, invitation and member
+# changes. Every subscriber has a bounded queue, a client too slow to drain it
+# gets a "resync" event and is disconnected, it should reload and reconnect
+@bp.route("/organizations/<int:org_id>/events", methods=["GET"])
+def stream_organization_events(org_id):
+    organization = Organization.query.get(org_id)
+    if not organization:
+        return jsonify({"message": "Organization not found"}), 404
+
+    # the stream does not use the database, release the connection now
+    # instead of holding it for the lifetime of the stream
+    db.session.close()
+
+    try:
+        subscription = current_app.extensions["pubsub"].subscribe(
+            "organization:%d" % org_id
+        )
+    except TooManySubscribers:
+        return (
+            jsonify({"message": "Too many open event streams, please try again"}),
+            503,
+            {"Retry-After": str(current_app.config["SSE_RETRY_AFTER"])},
+        )
+
+    heartbeat = current_app.config["SSE_HEARTBEAT_SECONDS"]
+    retry_ms = current_app.config["SSE_RETRY_AFTER"] * 1000
+
+    def stream():
+        try:
+            yield "retry: %d\n\n" % retry_ms
+            while not subscription.overflowed:
+                try:
+                    yield subscription.get(timeout=heartbeat)
+                except queue.Empty:
+                    # keeps proxies from closing the connection and lets the
+                    # server notice clients that went away
+                    yield ": heartbeat\n\n"
+
+            yield "event: resync\ndata: {}\n\n"
+        finally:
+            subscription.close()
+
+    return Response(
+        stream(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@bp.route("/debug/sql-stats", methods=["GET"])
+@debug_token_required
+def get_sql_stats():
+    if not current_app.config["SQL_INSTRUMENTATION"]:
+        return jsonify({"message": "SQL instrumentation is disabled"}), 404
+
+    return jsonify(sql_instrumentation.route_stats())
+
+
+@bp.route("/debug/user-cache", methods=["GET"])
+@debug_token_required
+def get_user_cache_stats():
+    return jsonify(user_cache.stats())
+
+
+@bp.route("/debug/membership-cache", methods=["GET"])
+@debug_token_required
+def get_membership_cache_stats():
+    return jsonify(membership_cache.stats())
+
+
+@bp.route("/debug/token-blocklist", methods=["GET"])
+@debug_token_required
+def get_token_blocklist_stats():
+    return jsonify(token_blocklist.stats())
+
+
+@bp.route("/debug/org-response-cache", methods=["GET"])
+@debug_token_required
+def get_org_response_cache_stats():
+    return jsonify(org_response_cache.stats())
+
+
+# connections of this process, size workers x (pool size + overflow) against
+# the database's max_connections
+@bp.route("/debug/db-pool", methods=["GET"])
+@debug_token_required
+def get_db_pool_stats():
+    return jsonify(
+        {bind or "default": pool_stats(engine) for bind, engine in db.engines.items()}
+    )
+
+
+# the queries behind the hot read routes, as run for the given organization/user
+def hot_route_queries(org_id, user_id):
+    return {
+        "organization members": organization_members_statement([org_id]),
+        "organization tasks": organization_tasks_query(org_id)
+        .order_by(Task.id)
+        .limit(current_app.config["PAGINATION_DEFAULT_LIMIT"])
+        .statement,
+        "organization open tasks": organization_tasks_query(org_id)
+        .filter_by(completed=False)
+        .order_by(Task.id)
+        .limit(current_app.config["PAGINATION_DEFAULT_LIMIT"])
+        .statement,
+        "organization completed tasks": organization_tasks_query(org_id)
+        .filter_by(completed=True)
+        .order_by(*KeysetOrder(Task.completed_at, Task.id, descending=True).order_by())
+        .limit(current_app.config["PAGINATION_DEFAULT_LIMIT"])
+        .statement,
+        "organization invitations": organization_invitations_query(org_id)
+        .order_by(pending_invitations.c.user_id)
+        .limit(current_app.config["PAGINATION_DEFAULT_LIMIT"])
+        .statement,
+        "user invitations": user_invitations_query(user_id)
+        .order_by(pending_invitations.c.organization_id)
+        .limit(current_app.config["PAGINATION_DEFAULT_LIMIT"])
+        .statement,
+        "owned organizations": owned_organizations_query(user_id).statement,
+        "working organizations": working_organizations_query(user_id).statement,
+        "organization role": org_roles_statement(user_id, org_id),
+        "user search": user_search_statement(
+            "a" * max(current_app.config["USER_SEARCH_MIN_PREFIX"], 1),
+            org_id,
+            current_app.config["USER_SEARCH_DEFAULT_LIMIT"],
+        ),
+    }
+
+
+# tables read by a full scan in the query's plan, and whether rows are sorted
+# after reading them instead of coming in index order. On Postgres sequential
+# scans (and sorts, for ordered queries) are disabled for the EXPLAIN, so a
+# table still scanned or a sort still done has no usable index
+def query_plan(statement, ordered=False):
+    connection = db.session.connection()
+    sql = str(
+        statement.compile(
+            dialect=connection.dialect, compile_kwargs={"literal_binds": True}
+        )
+    )
+
+    if connection.dialect.name == "postgresql":
+        connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        if ordered:
+            connection.exec_driver_sql("SET LOCAL enable_sort = off")
+        plan = connection.exec_driver_sql("EXPLAIN (FORMAT JSON) " + sql).scalar()
+        db.session.rollback()
+
+        scans = []
+        sorted_ = False
+        nodes = [plan[0]["Plan"]]
+        while nodes:
+            node = nodes.pop()
+            # an index scan that filters without an index condition reads the
+            # whole index, e.g. the primary key walked in id order
+            if node["Node Type"] == "Seq Scan" or (
+                node["Node Type"] in ("Index Scan", "Index Only Scan")
+                and "Filter" in node
+                and "Index Cond" not in node
+            ):
+                scans.append(node["Relation Name"])
+            elif node["Node Type"] in ("Sort", "Incremental Sort"):
+                sorted_ = True
+            nodes.extend(node.get("Plans", []))
+        return scans, sorted_
+
+    # SQLite reports full scans as "SCAN <table>", index lookups as "SEARCH"
+    # and sorts as "USE TEMP B-TREE FOR ... ORDER BY"
+    details = [
+        row[-1] for row in connection.exec_driver_sql("EXPLAIN QUERY PLAN " + sql)
+    ]
+    scans = [
+        detail.split()[1]
+        for detail in details
+        if detail.startswith("SCAN ") and detail.split()[1] in db.metadata.tables
+    ]
+    sorted_ = any(
+        detail.startswith("USE TEMP B-TREE FOR") and "ORDER BY" in detail
+        for detail in details
+    )
+    return scans, sorted_
+
+
+# hot route queries whose ORDER BY must be served by an index, a sort would
+# read every matching row to return one page
+INDEX_ORDERED_QUERIES = {"organization tasks"}
+
+
+# fails when a hot route's query falls back to scanning a whole table, or to
+# sorting where it should read in index order:
+#   flask --app app check-query-plans --org-id 1 --user-id 1
+@bp.cli.command("check-query-plans")
+@click.option("--org-id", type=int, default=1)
+@click.option("--user-id", type=int, default=1)
+def check_query_plans(org_id, user_id):
+    failed = False
+    for name, statement in hot_route_queries(org_id, user_id).items():
+        ordered = name in INDEX_ORDERED_QUERIES
+        scans, sorted_ = query_plan(statement, ordered)
+        if scans:
+            failed = True
+            click.echo("FAIL %s: sequential scan on %s" % (name, ", ".join(scans)))
+        elif sorted_ and ordered:
+            failed = True
+            click.echo("FAIL %s: sorted without an index" % name)
+        else:
+            click.echo("ok   %s" % name)
+
+    if failed:
+        sys.exit(1)
+
+
+# moves accepted and declined invitations that were answered before
+# older_than into archived_invitations, batch_size rows per transaction so the
+# live table is only locked briefly. Invitations resolved before responded_at
+# was recorded have none and are archived regardless of age. on_batch is
+# called with the number of rows of every committed batch
+def archive_resolved_invitations(
+    older_than, batch_size, max_batches=None, pause=0, on_batch=None
+):
+    resolved = or_(
+        pending_invitations.c.status.is_(True),
+        pending_invitations.c.user_response.is_(False),
+    )
+    due = or_(
+        pending_invitations.c.responded_at < older_than,
+        pending_invitations.c.responded_at.is_(None),
+    )
+
+    archived = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        rows = db.session.execute(
+            select(pending_invitations)
+            .where(resolved, due)
+            .order_by(
+                pending_invitations.c.organization_id, pending_invitations.c.user_id
+            )
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not rows:
+            db.session.rollback()
+            break
+
+        archived_at = utcnow()
+        db.session.execute(
+            insert(archived_invitations),
+            [{**row._asdict(), "archived_at": archived_at} for row in rows],
+        )
+        db.session.execute(
+            delete(pending_invitations).where(
+                tuple_(
+                    pending_invitations.c.user_id, pending_invitations.c.organization_id
+                ).in_([(row.user_id, row.organization_id) for row in rows])
+            )
+        )
+        db.session.execute(
+            update(Organization)
+            .where(Organization.id.in_({row.organization_id for row in rows}))
+            .values(version=Organization.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+
+        archived += len(rows)
+        batches += 1
+        if on_batch is not None:
+            on_batch(len(rows))
+        if len(rows) < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+
+    return archived
+
+
+# run from cron or any scheduler, e.g. nightly:
+#   flask --app app archive-invitations --older-than-days 30
+@bp.cli.command("archive-invitations")
+@click.option("--older-than-days", type=float, default=None)
+@click.option("--batch-size", type=int, default=None)
+@click.option("--max-batches", type=int, default=None)
+@click.option("--pause", type=float, default=0, help="seconds between batches")
+def archive_invitations_command(older_than_days, batch_size, max_batches, pause):
+    if older_than_days is None:
+        older_than_days = current_app.config["INVITATION_ARCHIVE_AGE_DAYS"]
+    if batch_size is None:
+        batch_size = current_app.config["INVITATION_ARCHIVE_BATCH_SIZE"]
+
+    start = time.perf_counter()
+
+    def report(rows):
+        elapsed = time.perf_counter() - start
+        click.echo("batch of %d invitations archived (%.1fs)" % (rows, elapsed))
+
+    archived = archive_resolved_invitations(
+        utcnow() - timedelta(days=older_than_days),
+        batch_size,
+        max_batches=max_batches,
+        pause=pause,
+        on_batch=report,
+    )
+    elapsed = time.perf_counter() - start
+    click.echo(
+        "%d invitations archived in %.2fs (%.0f rows/s)"
+        % (archived, elapsed, archived / elapsed if elapsed else 0)
+    )
+
+
+# recomputes the task counters and task_completion_stats from the task table,
+# for data written before they were maintained or by bulk imports
+def rebuild_task_stats():
+    tasks = select(func.count()).where(Task.organization_id == Organization.id)
+    db.session.execute(
+        update(Organization)
+        .values(
+            version=Organization.version + 1,
+            task_count=tasks.scalar_subquery(),
+            completed_task_count=tasks.where(
+                Task.completed.is_(True)
+            ).scalar_subquery(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+    db.session.execute(delete(task_completion_stats))
+    day = func.date(Task.completed_at)
+    db.session.execute(
+        insert(task_completion_stats).from_select(
+            ["organization_id", "user_id", "day", "completed"],
+            select(Task.organization_id, Task.completed_by, day, func.count())
+            .where(
+                Task.completed.is_(True),
+                Task.organization_id.isnot(None),
+                Task.completed_by.isnot(None),
+                Task.completed_at.isnot(None),
+            )
+            .group_by(Task.organization_id, Task.completed_by, day),
+        )
+    )
+    db.session.commit()
+
+
+#   flask --app app rebuild-task-stats
+@bp.cli.command("rebuild-task-stats")
+def rebuild_task_stats_command():
+    rebuild_task_stats()
+    click.echo("task stats rebuilt")
+
+
+# work the first requests would otherwise do. With gunicorn --preload it runs
+# once in the master and the workers share the result copy-on-write
+def warm_up(app):
+    configure_mappers()
+    app.url_map.update()
+
+
+# connections cannot be shared across fork, every worker opens its own after
+# it was forked (see gunicorn.conf.py)
+def warm_up_connections(app):
+    with app.app_context():
+        return sum(
+            pre_connect(engine, app.config["WARM_UP_CONNECTIONS"])
+            for engine in db.engines.values()
+        )
+
+
+def create_app(config=None):
+    # create the app
+    app = Flask(__name__)
+    CORS(app)
+
+    # from config file
+    app.config.from_object(Config)
+    if config:
+        app.config.update(config)
+
+    app.json_provider_class = FastJSONProvider
+    app.json = FastJSONProvider(app)
+
+    app.config["SQLALCHEMY_DATABASE_URI"]
+    app.config["JWT_SECRET_KEY"]
+    app.config["JWT_ACCESS_TOKEN_EXPIRES"]
+    # disables a feature that automatically tracks modifications to objects and emits signals
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"]
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(
+        app.config, app.config["SQLALCHEMY_DATABASE_URI"]
+    )
+    app.config["SQLALCHEMY_BINDS"] = replica_binds(
+        app.config["REPLICA_DATABASE_URL"],
+        engine_options(app.config, app.config["REPLICA_DATABASE_URL"]),
+    )
+
+    db.init_app(app)
+    migrate.init_app(app, db)
+    jwt.init_app(app)
+
+    with app.app_context():
+        engines = list(db.engines.values())
+    dispose_after_fork(engines)
+
+    if app.config["SQL_INSTRUMENTATION"]:
+        sql_instrumentation.init_app(app, engines)
+
+    password_hasher.init_app(app)
+    user_cache.configure(app.config["USER_CACHE_SIZE"], app.config["USER_CACHE_TTL"])
+    org_response_cache.configure(
+        app.config["ORG_RESPONSE_CACHE_SIZE"], app.config["ORG_RESPONSE_CACHE_TTL"]
+    )
+    membership_cache.configure(
+        app.config["MEMBERSHIP_CACHE_SIZE"], app.config["MEMBERSHIP_CACHE_TTL"]
+    )
+    token_blocklist.init_app(app)
+
+    # delivers organization events to the /organizations/<id>/events streams
+    broker_class = app.config["PUBSUB_BROKER"]
+    if broker_class == "auto":
+        broker_class = (
+            "pubsub.PostgresBroker"
+            if make_url(app.config["SQLALCHEMY_DATABASE_URI"]).get_backend_name()
+            == "postgresql"
+            else "pubsub.InProcessBroker"
+        )
+    broker = import_string(broker_class)()
+    broker.init_app(app)
+    app.extensions["pubsub"] = broker
+
+    app.register_blueprint(bp)
+
+    if app.config["WARM_UP"]:
+        warm_up(app)
+    return app
+
+
 if __name__ == "__main__":
-    app.run(debug=True)
+    create_app().run(debug=True)
@@ -0,0 +1,82 @@
+# Peak Python memory while streaming GET /organizations/<id>/tasks/export for
+# organizations of growing size, it should stay flat. Runs against a throwaway
+# SQLite database
+#
+#   python benchmarks/export_memory_benchmark.py --sizes 1000 10000 100000
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "export_memory_benchmark.db")
+os.environ["DATABASE_URL"] = "sqlite:///" + DB_PATH
+os.environ.setdefault("SECRET_KEY", "benchmark")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert  # noqa: E402
+
+from app import Organization, Task, create_app, db  # noqa: E402
+
+app = create_app()
+
+
+def seed_organization(name, size):
+    org = Organization(name=name)
+    db.session.add(org)
+    db.session.flush()
+    for start in range(0, size, 10000):
+        db.session.execute(
+            insert(Task),
+            [
+                {
+                    "title": "task %d" % number,
+                    "description": "description of task %d" % number,
+                    "completed": number % 2 == 0,
+                    "completed_by_email": "user%d@example.com" % (number % 50),
+                    "completed_at": datetime(2024, 1, 1) if number % 2 == 0 else None,
+                    "organization_id": org.id,
+                }
+                for number in range(start, min(start + 10000, size))
+            ],
+        )
+    db.session.commit()
+    return org.id
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.create_all()
+        org_ids = {
+            size: seed_organization("org-%d" % size, size) for size in args.sizes
+        }
+
+    client = app.test_client()
+    print("%10s %12s %14s %12s" % ("tasks", "bytes", "peak memory KiB", "seconds"))
+    for size, org_id in org_ids.items():
+        tracemalloc.start()
+        start = time.perf_counter()
+        response = client.get(
+            "/organizations/%d/tasks/export" % org_id,
+            query_string={"format": args.format},
+            buffered=False,
+        )
+        size_bytes = sum(len(chunk) for chunk in response.response)
+        response.close()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print("%10d %12d %14.1f %12.2f" % (size, size_bytes, peak / 1024, elapsed))
+
+    os.remove(DB_PATH)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# Encode throughput of Flask's default JSON provider against FastJSONProvider
+# with the standard library and with orjson, on task lists and organization
+# payloads shaped like the responses of the task and organization routes
+#
+#   python benchmarks/json_benchmark.py --tasks 100 1000 --repeat 200
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from json_provider import FastJSONProvider, orjson  # noqa: E402
+
+
+def task_payload(size):
+    start = datetime(2024, 1, 1, 9, 30)
+    return [
+        {
+            "id": number,
+            "title": "task %d" % number,
+            "description": "description of task %d, with some more words" % number,
+            "completed": number % 2 == 0,
+            "completed_by": number % 50 if number % 2 == 0 else None,
+            "completed_by_email": (
+                "user%d@example.com" % (number % 50) if number % 2 == 0 else None
+            ),
+            "completed_at": (
+                start + timedelta(hours=number) if number % 2 == 0 else None
+            ),
+        }
+        for number in range(size)
+    ]
+
+
+def members(role, count):
+    return [
+        {"id": number, "email": "%s%d@example.com" % (role, number)}
+        for number in range(count)
+    ]
+
+
+def organization_payload(size):
+    return [
+        {
+            "id": number,
+            "name": "organization %d" % number,
+            "owners": members("owner", 2),
+            "admins": members("admin", 5),
+            "employees": members("employee", 50),
+        }
+        for number in range(size)
+    ]
+
+
+# the provider only holds a weak reference to its app, the app is returned
+# to keep it alive
+def make_app(provider_class, backend):
+    app = Flask(__name__)
+    app.config.update(
+        JSON_BACKEND=backend, JSON_COMPACT=True, JSON_DATETIME_FORMAT="http"
+    )
+    app.json = provider_class(app)
+    return app
+
+
+def encode_rate(app, payload, repeat):
+    encode = getattr(app.json, "dumps_bytes", app.json.dumps)
+    size = len(encode(payload))
+    start = time.perf_counter()
+    for _ in range(repeat):
+        encode(payload)
+    elapsed = time.perf_counter() - start
+    return repeat / elapsed, size * repeat / elapsed / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--organizations", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    providers = [
+        ("flask default", make_app(DefaultJSONProvider, "json")),
+        ("fast / json", make_app(FastJSONProvider, "json")),
+    ]
+    if orjson is not None:
+        providers.append(("fast / orjson", make_app(FastJSONProvider, "orjson")))
+    else:
+        print("orjson is not installed, only the standard library is measured")
+
+    payloads = [("tasks", size, task_payload(size)) for size in args.tasks] + [
+        ("organizations", size, organization_payload(size))
+        for size in args.organizations
+    ]
+
+    print(
+        "%-14s %7s %-14s %12s %10s %9s"
+        % ("payload", "items", "provider", "encodes/s", "MiB/s", "speedup")
+    )
+    for name, size, payload in payloads:
+        baseline = None
+        for provider_name, app in providers:
+            rate, throughput = encode_rate(app, payload, args.repeat)
+            baseline = baseline or rate
+            print(
+                "%-14s %7d %-14s %12.1f %10.1f %8.1fx"
+                % (name, size, provider_name, rate, throughput, rate / baseline)
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,672 @@
+# Latency, throughput and queries per request of every route, driven with the
+# Flask test client from concurrent workers against a seeded database. Runs
+# against a throwaway SQLite database unless --database-url is given, results
+# are written as JSON so runs can be compared between commits
+#
+#   python benchmarks/load_benchmark.py --requests 200 --workers 8
+#   python benchmarks/load_benchmark.py --routes "GET /user/organizations"
+import argparse
+import itertools
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", help="defaults to a throwaway SQLite db")
+    parser.add_argument(
+        "--reset",
+        action="store_true",
+        help="drop and recreate the tables of --database-url before seeding",
+    )
+    parser.add_argument(
+        "--replica",
+        action="store_true",
+        help="serve the read only routes from a copy of the seeded SQLite db",
+    )
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--organizations", type=int, default=50)
+    parser.add_argument("--admins", type=int, default=2)
+    parser.add_argument("--employees", type=int, default=20)
+    parser.add_argument("--invitations", type=int, default=10)
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=200, help="per route")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--routes", nargs="+", help="only run these routes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="load_benchmark.json")
+    return parser.parse_args()
+
+
+args = parse_args()
+
+DB_PATH = None
+if args.database_url:
+    os.environ["DATABASE_URL"] = args.database_url
+else:
+    DB_PATH = os.path.join(tempfile.mkdtemp(), "load_benchmark.db")
+    os.environ["DATABASE_URL"] = "sqlite:///" + DB_PATH
+    if args.replica:
+        os.environ["REPLICA_DATABASE_URL"] = "sqlite:///%s-replica" % DB_PATH
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ["SQL_INSTRUMENTATION"] = "true"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_jwt_extended import (  # noqa: E402
+    create_access_token,
+    create_refresh_token,
+)
+
+from app import create_app, db  # noqa: E402
+from db_pool import pool_stats  # noqa: E402
+from seed import PASSWORD, seed_database  # noqa: E402
+
+app = create_app()
+
+
+class PoolExhausted(Exception):
+    pass
+
+
+# pools of ids the write routes consume, so no two requests act on the same
+# member, invitation or task and every request does the work it is meant to
+class Pool:
+    def __init__(self, items):
+        self._items = list(items)
+        self._lock = threading.Lock()
+
+    def pop(self):
+        with self._lock:
+            if not self._items:
+                raise PoolExhausted()
+            return self._items.pop()
+
+
+class Scenario:
+    def __init__(self, seeded, rng):
+        self.rng = rng
+        self.users = seeded["users"]
+        self.organizations = seeded["organizations"]
+        self.org_ids = list(self.organizations)
+        self.counter = itertools.count()
+        self.tokens = {}
+        self.refresh_tokens = {}
+
+        invited = []
+        outsiders = []
+        for org_id, members in self.organizations.items():
+            invited.extend((org_id, user_id) for user_id in members["invited"])
+            taken = {
+                members["owner"],
+                *members["admins"],
+                *members["employees"],
+                *members["invited"],
+            }
+            outsiders.extend(
+                (org_id, user_id)
+                for user_id in rng.sample(range(1, self.users + 1), 20)
+                if user_id not in taken
+            )
+        rng.shuffle(invited)
+        rng.shuffle(outsiders)
+
+        # accepting, declining and deleting each get their own invitations
+        self.invitations = {
+            name: Pool(invited[number::3])
+            for number, name in enumerate(("accept", "decline", "delete"))
+        }
+        self.outsiders = Pool(outsiders)
+
+        # moving and removing members each get their own admins and employees
+        employees = [
+            (org_id, user_id)
+            for org_id, members in self.organizations.items()
+            for user_id in members["employees"]
+        ]
+        admins = [
+            (org_id, user_id)
+            for org_id, members in self.organizations.items()
+            for user_id in members["admins"]
+        ]
+        self.employees = {"move": Pool(employees[::2]), "remove": Pool(employees[1::2])}
+        self.admins = {"move": Pool(admins[::2]), "remove": Pool(admins[1::2])}
+
+        self.task_organizations = seeded["task_organizations"]
+        open_task_ids = seeded["open_task_ids"]
+        completed_task_ids = seeded["completed_task_ids"]
+        self.open_tasks = Pool(open_task_ids[1::2])
+        self.completed_tasks = Pool(completed_task_ids[1::2])
+        self.deletable_tasks = Pool(open_task_ids[::2] + completed_task_ids[::2])
+
+    def token(self, user_id):
+        if user_id not in self.tokens:
+            with app.app_context():
+                self.tokens[user_id] = create_access_token(
+                    identity="user%d@example.com" % user_id
+                )
+        return {"Authorization": "Bearer %s" % self.tokens[user_id]}
+
+    def refresh_token(self, user_id):
+        if user_id not in self.refresh_tokens:
+            with app.app_context():
+                self.refresh_tokens[user_id] = create_refresh_token(
+                    identity="user%d@example.com" % user_id
+                )
+        return self.refresh_tokens[user_id]
+
+    # /logout revokes the tokens it is sent, so it gets its own instead of the
+    # cached ones the other routes keep using
+    def new_tokens(self, user_id):
+        identity = "user%d@example.com" % user_id
+        with app.app_context():
+            return create_access_token(identity=identity), create_refresh_token(
+                identity=identity
+            )
+
+    def org(self):
+        org_id = self.rng.choice(self.org_ids)
+        return org_id, self.organizations[org_id]
+
+    def member(self):
+        org_id, members = self.org()
+        return org_id, self.rng.choice(
+            [members["owner"], *members["admins"], *members["employees"]]
+        )
+
+    def owner(self):
+        org_id, members = self.org()
+        return org_id, members["owner"]
+
+    # the organization routes require the owner or admin role, requests are
+    # sent as the owner of the organization they act on
+    def owner_token(self, org_id):
+        return self.token(self.organizations[org_id]["owner"])
+
+    def task_owner_token(self, task_id):
+        return self.owner_token(self.task_organizations[task_id])
+
+    def user(self):
+        return self.rng.randint(1, self.users)
+
+
+def signup(s):
+    email = "signup%d@example.com" % next(s.counter)
+    return "POST", "/signup", {"json": {"email": email, "password": PASSWORD}}
+
+
+def signin(s):
+    email = "user%d@example.com" % s.user()
+    return "POST", "/signin", {"json": {"email": email, "password": PASSWORD}}
+
+
+def refresh(s):
+    return (
+        "POST",
+        "/refresh",
+        {"headers": {"Authorization": "Bearer %s" % s.refresh_token(s.user())}},
+    )
+
+
+def logout(s):
+    access_token, refresh_token = s.new_tokens(s.user())
+    return (
+        "POST",
+        "/logout",
+        {
+            "json": {"refresh_token": refresh_token},
+            "headers": {"Authorization": "Bearer %s" % access_token},
+        },
+    )
+
+
+def get_user(s):
+    return "GET", "/user", {"headers": s.token(s.user())}
+
+
+def get_user_organizations(s):
+    return "GET", "/user/organizations", {"headers": s.token(s.member()[1])}
+
+
+def get_users(s):
+    user_ids = ",".join(str(s.user()) for _ in range(20))
+    return "GET", "/users?user_ids=%s" % user_ids, {}
+
+
+def search_users(s):
+    org_id = s.org()[0]
+    return (
+        "GET",
+        "/users/search?q=user%d&org_id=%d" % (s.rng.randint(1, 99), org_id),
+        {"headers": s.owner_token(org_id)},
+    )
+
+
+def get_user_invitations(s):
+    return "GET", "/users/%d/invitations" % s.user(), {}
+
+
+def add_organization(s):
+    name = "benchmark organization %d" % next(s.counter)
+    return (
+        "POST",
+        "/organizations",
+        {"json": {"name": name}, "headers": s.token(s.user())},
+    )
+
+
+def update_organization(s):
+    org_id, owner = s.owner()
+    name = "renamed organization %d" % next(s.counter)
+    return (
+        "PUT",
+        "/organizations/%d" % org_id,
+        {"json": {"name": name}, "headers": s.token(owner)},
+    )
+
+
+def send_invitation(s):
+    org_id, user_id = s.outsiders.pop()
+    owner = s.organizations[org_id]["owner"]
+    return (
+        "POST",
+        "/organizations/%d/invite" % org_id,
+        {"json": {"email": "user%d@example.com" % user_id}, "headers": s.token(owner)},
+    )
+
+
+def send_invitations(s):
+    org_id, owner = s.owner()
+    emails = ["user%d@example.com" % s.user() for _ in range(20)]
+    return (
+        "POST",
+        "/organizations/%d/invitations" % org_id,
+        {"json": {"emails": emails}, "headers": s.token(owner)},
+    )
+
+
+def accept_invitation(s):
+    org_id, user_id = s.invitations["accept"].pop()
+    return (
+        "POST",
+        "/organizations/%d/accept-invitation" % org_id,
+        {"headers": s.token(user_id)},
+    )
+
+
+def decline_invitation(s):
+    org_id, user_id = s.invitations["decline"].pop()
+    return (
+        "POST",
+        "/organizations/%d/decline-invitation" % org_id,
+        {"headers": s.token(user_id)},
+    )
+
+
+def delete_pending_invitation(s):
+    org_id, user_id = s.invitations["delete"].pop()
+    return (
+        "DELETE",
+        "/delete-pending-invitation?user_id=%d&org_id=%d" % (user_id, org_id),
+        {"headers": s.owner_token(org_id)},
+    )
+
+
+def get_organization_invitations(s):
+    return "GET", "/organizations/%d/invitations" % s.org()[0], {}
+
+
+def get_organization(s):
+    return "GET", "/organization/%d" % s.org()[0], {}
+
+
+def get_organization_dashboard(s):
+    org_id, user_id = s.member()
+    return "GET", "/organizations/%d/dashboard" % org_id, {"headers": s.token(user_id)}
+
+
+def move_employee_to_admin(s):
+    org_id, user_id = s.employees["move"].pop()
+    return (
+        "POST",
+        "/move-employee-to-admin",
+        {
+            "json": {"user_id": user_id, "org_id": org_id},
+            "headers": s.owner_token(org_id),
+        },
+    )
+
+
+def move_admin_to_employee(s):
+    org_id, user_id = s.admins["move"].pop()
+    return (
+        "POST",
+        "/move-admin-to-employee",
+        {
+            "json": {"user_id": user_id, "org_id": org_id},
+            "headers": s.owner_token(org_id),
+        },
+    )
+
+
+def remove_employee(s):
+    org_id, user_id = s.employees["remove"].pop()
+    return (
+        "DELETE",
+        "/remove-employee?user_id=%d&org_id=%d" % (user_id, org_id),
+        {"headers": s.owner_token(org_id)},
+    )
+
+
+def remove_admin(s):
+    org_id, user_id = s.admins["remove"].pop()
+    return (
+        "DELETE",
+        "/remove-admin?user_id=%d&org_id=%d" % (user_id, org_id),
+        {"headers": s.owner_token(org_id)},
+    )
+
+
+def add_task(s):
+    org_id, owner = s.owner()
+    return (
+        "POST",
+        "/organizations/%d/tasks" % org_id,
+        {
+            "json": {
+                "title": "benchmark task",
+                "description": "added by the benchmark",
+            },
+            "headers": s.token(owner),
+        },
+    )
+
+
+def get_organization_tasks(s):
+    return "GET", "/organizations/%d/tasks" % s.org()[0], {}
+
+
+def get_organization_tasks_page(s):
+    return "GET", "/organizations/%d/tasks?limit=50" % s.org()[0], {}
+
+
+def get_organization_task_stats(s):
+    return "GET", "/organizations/%d/tasks/stats" % s.org()[0], {}
+
+
+def export_organization_tasks(s):
+    return "GET", "/organizations/%d/tasks/export" % s.org()[0], {}
+
+
+def batch_update_tasks(s):
+    org_id, user_id = s.owner()
+    operations = [
+        {"op": "create", "title": "batch task", "description": "added in a batch"}
+        for _ in range(10)
+    ]
+    return (
+        "POST",
+        "/organizations/%d/tasks/batch" % org_id,
+        {"json": {"operations": operations}, "headers": s.token(user_id)},
+    )
+
+
+def complete_task(s):
+    task_id = s.open_tasks.pop()
+    return (
+        "PUT",
+        "/complete-task/%d" % task_id,
+        {
+            "json": {"date": datetime.now().strftime("%d %b %Y")},
+            "headers": s.task_owner_token(task_id),
+        },
+    )
+
+
+def uncheck_task(s):
+    task_id = s.completed_tasks.pop()
+    return (
+        "PUT",
+        "/uncheck-task/%d" % task_id,
+        {"headers": s.task_owner_token(task_id)},
+    )
+
+
+def delete_task(s):
+    task_id = s.deletable_tasks.pop()
+    return (
+        "DELETE",
+        "/delete-task/%d" % task_id,
+        {"headers": s.task_owner_token(task_id)},
+    )
+
+
+ROUTES = {
+    "POST /signup": signup,
+    "POST /signin": signin,
+    "POST /refresh": refresh,
+    "POST /logout": logout,
+    "GET /user": get_user,
+    "GET /user/organizations": get_user_organizations,
+    "GET /users": get_users,
+    "GET /users/search": search_users,
+    "GET /users/<id>/invitations": get_user_invitations,
+    "POST /organizations": add_organization,
+    "PUT /organizations/<id>": update_organization,
+    "POST /organizations/<id>/invite": send_invitation,
+    "POST /organizations/<id>/invitations": send_invitations,
+    "POST /organizations/<id>/accept-invitation": accept_invitation,
+    "POST /organizations/<id>/decline-invitation": decline_invitation,
+    "GET /organizations/<id>/invitations": get_organization_invitations,
+    "GET /organization/<id>": get_organization,
+    "GET /organizations/<id>/dashboard": get_organization_dashboard,
+    "DELETE /delete-pending-invitation": delete_pending_invitation,
+    "POST /move-employee-to-admin": move_employee_to_admin,
+    "POST /move-admin-to-employee": move_admin_to_employee,
+    "DELETE /remove-employee": remove_employee,
+    "DELETE /remove-admin": remove_admin,
+    "POST /organizations/<id>/tasks": add_task,
+    "GET /organizations/<id>/tasks": get_organization_tasks,
+    "GET /organizations/<id>/tasks?limit=50": get_organization_tasks_page,
+    "GET /organizations/<id>/tasks/stats": get_organization_task_stats,
+    "GET /organizations/<id>/tasks/export": export_organization_tasks,
+    "POST /organizations/<id>/tasks/batch": batch_update_tasks,
+    "PUT /complete-task/<id>": complete_task,
+    "PUT /uncheck-task/<id>": uncheck_task,
+    "DELETE /delete-task/<id>": delete_task,
+}
+
+
+# most queries a request may run however many organizations and members are
+# involved, a run that exceeds one fails. /user/organizations reads the owned
+# and the worked in organizations and all their members, plus the user on a
+# user cache miss and the revoked tokens on a blocklist sync
+QUERY_BUDGETS = {
+    "GET /user/organizations": 5,
+    "GET /organization/<id>": 2,
+}
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_route(name, build_request, scenario, requests, workers):
+    clients = threading.local()
+
+    def one_request(_):
+        try:
+            method, url, kwargs = build_request(scenario)
+        except PoolExhausted:
+            return None
+        if not hasattr(clients, "client"):
+            clients.client = app.test_client()
+
+        start = time.perf_counter()
+        response = clients.client.open(url, method=method, **kwargs)
+        response.get_data()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        response.close()
+        return (
+            elapsed_ms,
+            response.status_code,
+            int(response.headers.get("X-DB-Query-Count", 0)),
+        )
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = [
+            result
+            for result in executor.map(one_request, range(requests))
+            if result is not None
+        ]
+    wall_seconds = time.perf_counter() - start
+
+    latencies = sorted(result[0] for result in results)
+    statuses = {}
+    for _, status, _ in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    queries = [result[2] for result in results]
+
+    return {
+        "requests": len(results),
+        "statuses": statuses,
+        "p50_ms": percentile(latencies, 0.50),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99),
+        "max_ms": latencies[-1] if latencies else None,
+        "throughput_rps": len(results) / wall_seconds if results else 0.0,
+        "queries_per_request": sum(queries) / len(queries) if queries else None,
+        "max_queries": max(queries) if queries else None,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    routes = args.routes or list(ROUTES)
+    unknown = [name for name in routes if name not in ROUTES]
+    if unknown:
+        sys.exit("unknown routes: %s" % ", ".join(unknown))
+
+    seed_options = {
+        "users": args.users,
+        "organizations": args.organizations,
+        "admins_per_org": args.admins,
+        "employees_per_org": args.employees,
+        "invitations_per_org": args.invitations,
+        "tasks_per_org": args.tasks,
+        "seed": args.seed,
+    }
+    with app.app_context():
+        if DB_PATH or args.reset:
+            db.drop_all()
+        db.create_all()
+        seeded = seed_database(**seed_options)
+        database = db.engine.url.get_backend_name()
+        if DB_PATH and args.replica:
+            # the replica stays a snapshot of the seeded data
+            db.engine.dispose()
+            shutil.copyfile(DB_PATH, DB_PATH + "-replica")
+
+    scenario = Scenario(seeded, random.Random(args.seed))
+    results = {}
+
+    print(
+        "%-45s %8s %9s %9s %9s %9s %8s  %s"
+        % (
+            "route",
+            "requests",
+            "p50 ms",
+            "p95 ms",
+            "p99 ms",
+            "req/s",
+            "queries",
+            "statuses",
+        )
+    )
+    for name in routes:
+        stats = run_route(name, ROUTES[name], scenario, args.requests, args.workers)
+        results[name] = stats
+        if not stats["requests"]:
+            print("%-45s %8d" % (name, 0))
+            continue
+        print(
+            "%-45s %8d %9.2f %9.2f %9.2f %9.1f %8.1f  %s"
+            % (
+                name,
+                stats["requests"],
+                stats["p50_ms"],
+                stats["p95_ms"],
+                stats["p99_ms"],
+                stats["throughput_rps"],
+                stats["queries_per_request"],
+                " ".join("%s:%d" % item for item in sorted(stats["statuses"].items())),
+            )
+        )
+
+    with app.app_context():
+        db_pool = {
+            bind or "default": pool_stats(engine) for bind, engine in db.engines.items()
+        }
+
+    with open(args.output, "w") as output:
+        json.dump(
+            {
+                "commit": git_commit(),
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "database": database,
+                "seed": seed_options,
+                "requests_per_route": args.requests,
+                "workers": args.workers,
+                "replica": bool(args.replica and DB_PATH),
+                "routes": results,
+                "db_pool": db_pool,
+            },
+            output,
+            indent=2,
+        )
+    print("results written to %s" % args.output)
+
+    over_budget = [
+        "%s ran %d queries, at most %d expected"
+        % (name, results[name]["max_queries"], QUERY_BUDGETS[name])
+        for name in routes
+        if name in QUERY_BUDGETS
+        and results[name]["requests"]
+        and results[name]["max_queries"] > QUERY_BUDGETS[name]
+    ]
+
+    if DB_PATH:
+        os.remove(DB_PATH)
+        if args.replica:
+            os.remove(DB_PATH + "-replica")
+
+    if over_budget:
+        sys.exit("\n".join(over_budget))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# Membership check latency as organizations grow: the EXISTS/UNION queries
+# used by the routes against loading a role collection, the way the routes
+# used to check membership. Runs against a throwaway SQLite database
+#
+#   python benchmarks/membership_benchmark.py --sizes 100 1000 10000
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "membership_benchmark.db")
+os.environ["DATABASE_URL"] = "sqlite:///" + DB_PATH
+os.environ.setdefault("SECRET_KEY", "benchmark")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert  # noqa: E402
+
+from app import (  # noqa: E402
+    Organization,
+    User,
+    create_app,
+    db,
+    employees,
+    get_org_role,
+    has_org_role,
+)
+
+app = create_app()
+
+
+def median_ms(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        db.session.expire_all()
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def seed_organization(name, size, first_user_id):
+    user_ids = range(first_user_id, first_user_id + size)
+    db.session.execute(
+        insert(User),
+        [
+            {"id": user_id, "email": "user%d@example.com" % user_id, "password": "-"}
+            for user_id in user_ids
+        ],
+    )
+    org = Organization(name=name)
+    db.session.add(org)
+    db.session.flush()
+    db.session.execute(
+        employees.insert(),
+        [{"user_id": user_id, "organization_id": org.id} for user_id in user_ids],
+    )
+    db.session.commit()
+    return org.id, user_ids[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.create_all()
+
+        print(
+            "%10s %18s %18s %22s"
+            % ("members", "has_org_role ms", "get_org_role ms", "load employees ms")
+        )
+        next_user_id = 1
+        for size in args.sizes:
+            org_id, user_id = seed_organization("org-%d" % size, size, next_user_id)
+            next_user_id += size
+
+            exists_ms = median_ms(
+                lambda: has_org_role(user_id, org_id, "employee"), args.repeat
+            )
+            role_ms = median_ms(lambda: get_org_role(user_id, org_id), args.repeat)
+            collection_ms = median_ms(
+                lambda: db.session.get(User, user_id)
+                in db.session.get(Organization, org_id).employees,
+                args.repeat,
+            )
+            print(
+                "%10d %18.3f %18.3f %22.3f" % (size, exists_ms, role_ms, collection_ms)
+            )
+
+    os.remove(DB_PATH)
+
+
+if __name__ == "__main__":
+    main()
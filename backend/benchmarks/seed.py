@@ -0,0 +1,144 @@
+# Synthetic data generator for the benchmarks: users, organizations with
+# owners/admins/employees, pending invitations and tasks, inserted in bulk
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select
+from werkzeug.security import generate_password_hash
+
+from app import (
+    Organization,
+    Task,
+    User,
+    admins,
+    db,
+    employees,
+    owners,
+    pending_invitations,
+    rebuild_task_stats,
+)
+
+PASSWORD = "benchmark-password"
+BATCH_SIZE = 5000
+
+
+def insert_batches(table, rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        db.session.execute(insert(table), rows[start : start + BATCH_SIZE])
+
+
+# must run inside an app context, returns the ids the benchmarks pick from
+def seed_database(
+    users=1000,
+    organizations=50,
+    admins_per_org=2,
+    employees_per_org=20,
+    invitations_per_org=10,
+    tasks_per_org=200,
+    completed_ratio=0.5,
+    seed=0,
+):
+    rng = random.Random(seed)
+    password = generate_password_hash(PASSWORD, "pbkdf2:sha256:260000")
+
+    insert_batches(
+        User,
+        [
+            {
+                "id": user_id,
+                "email": "user%d@example.com" % user_id,
+                "password": password,
+            }
+            for user_id in range(1, users + 1)
+        ],
+    )
+    insert_batches(
+        Organization,
+        [
+            {"id": org_id, "name": "organization %d" % org_id}
+            for org_id in range(1, organizations + 1)
+        ],
+    )
+
+    # the ids above were given explicitly, move PostgreSQL's sequences past
+    # them so rows created by the benchmarked routes get fresh ids
+    if db.session.get_bind().dialect.name == "postgresql":
+        for model in (User, Organization):
+            db.session.execute(
+                select(
+                    func.setval(
+                        func.pg_get_serial_sequence(model.__tablename__, "id"),
+                        select(func.max(model.id)).scalar_subquery(),
+                    )
+                )
+            )
+
+    memberships = {owners: [], admins: [], employees: [], pending_invitations: []}
+    members_by_org = {}
+    tasks = []
+    open_task_ids = []
+    completed_task_ids = []
+    task_organizations = {}
+    start_date = datetime(2024, 1, 1)
+
+    for org_id in range(1, organizations + 1):
+        picked = rng.sample(
+            range(1, users + 1),
+            min(users, 1 + admins_per_org + employees_per_org + invitations_per_org),
+        )
+        owner, picked = picked[0], picked[1:]
+        org_admins, picked = picked[:admins_per_org], picked[admins_per_org:]
+        org_employees, invited = (
+            picked[:employees_per_org],
+            picked[employees_per_org:],
+        )
+
+        memberships[owners].append({"user_id": owner, "organization_id": org_id})
+        for table, user_ids in (
+            (admins, org_admins),
+            (employees, org_employees),
+            (pending_invitations, invited),
+        ):
+            memberships[table].extend(
+                {"user_id": user_id, "organization_id": org_id} for user_id in user_ids
+            )
+        members_by_org[org_id] = {
+            "owner": owner,
+            "admins": org_admins,
+            "employees": org_employees,
+            "invited": invited,
+        }
+
+        for number in range(tasks_per_org):
+            task = {
+                "title": "task %d of organization %d" % (number, org_id),
+                "description": "synthetic task",
+                "completed": False,
+                "organization_id": org_id,
+            }
+            if rng.random() < completed_ratio:
+                user_id = rng.choice([owner, *org_admins, *org_employees])
+                task.update(
+                    completed=True,
+                    completed_by=user_id,
+                    completed_by_email="user%d@example.com" % user_id,
+                    completed_at=start_date + timedelta(days=rng.randrange(365)),
+                )
+            tasks.append(task)
+            task_ids = completed_task_ids if task["completed"] else open_task_ids
+            task_ids.append(len(tasks))
+            task_organizations[len(tasks)] = org_id
+
+    for table, rows in memberships.items():
+        insert_batches(table, rows)
+    insert_batches(Task, tasks)
+    db.session.commit()
+    rebuild_task_stats()
+
+    return {
+        "users": users,
+        "organizations": members_by_org,
+        "open_task_ids": open_task_ids,
+        "completed_task_ids": completed_task_ids,
+        "task_organizations": task_organizations,
+    }
@@ -0,0 +1,149 @@
+# App startup time, measured in fresh interpreters against a throwaway SQLite
+# database: importing app, create_app() with and without warm-up, the first
+# and second request, and how long a forked worker takes to serve its first
+# request with the app preloaded in the parent (gunicorn --preload) or
+# loaded after the fork
+#
+#   python benchmarks/startup_benchmark.py --repeat 10
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EMAIL = "startup@example.com"
+
+
+def load_app(warm_up):
+    from flask_jwt_extended import create_access_token
+
+    import app as module
+
+    app = module.create_app({"WARM_UP": warm_up})
+    with app.app_context():
+        token = create_access_token(identity=EMAIL)
+    return module, app, {"Authorization": "Bearer " + token}
+
+
+def request_ms(client, headers):
+    start = time.perf_counter()
+    response = client.get("/user", headers=headers)
+    elapsed = (time.perf_counter() - start) * 1000
+    assert response.status_code == 200, response.status_code
+    return elapsed
+
+
+# one measurement per fresh interpreter, printed as JSON for the parent
+def child_cold(warm_up):
+    start = time.perf_counter()
+    import app as module
+
+    imported = time.perf_counter()
+    app = module.create_app({"WARM_UP": warm_up})
+    created = time.perf_counter()
+
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        headers = {"Authorization": "Bearer " + create_access_token(identity=EMAIL)}
+    client = app.test_client()
+    return {
+        "import_ms": (imported - start) * 1000,
+        "create_app_ms": (created - imported) * 1000,
+        "first_request_ms": request_ms(client, headers),
+        "second_request_ms": request_ms(client, headers),
+    }
+
+
+# time from fork until the worker answered its first request
+def child_fork(preload):
+    if preload:
+        module, app, headers = load_app(True)
+
+    read_fd, write_fd = os.pipe()
+    start = time.perf_counter()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        if not preload:
+            module, app, headers = load_app(True)
+        module.warm_up_connections(app)
+        request_ms(app.test_client(), headers)
+        os.write(write_fd, b"%f" % ((time.perf_counter() - start) * 1000))
+        os._exit(0)
+
+    os.close(write_fd)
+    elapsed = float(os.read(read_fd, 64))
+    os.waitpid(pid, 0)
+    return {"worker_ready_ms": elapsed}
+
+
+def setup_database(env):
+    code = (
+        "import app as m\n"
+        "from werkzeug.security import generate_password_hash\n"
+        "a = m.create_app()\n"
+        "with a.app_context():\n"
+        "    m.db.create_all()\n"
+        "    m.db.session.add(m.User(email=%r, password=generate_password_hash('x')))\n"
+        "    m.db.session.commit()\n" % EMAIL
+    )
+    subprocess.run([sys.executable, "-c", code], env=env, cwd=BACKEND, check=True)
+
+
+def run_child(env, mode, flag, repeat):
+    results = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", mode, str(flag)],
+            env=env,
+            cwd=BACKEND,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    return results
+
+
+def summarize(label, results):
+    for key in results[0]:
+        values = sorted(result[key] for result in results)
+        print(
+            "%-22s %-18s %9.1f %9.1f %9.1f"
+            % (label, key, statistics.median(values), values[0], values[-1])
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        sys.path.insert(0, BACKEND)
+        mode, flag = args.child[0], args.child[1] == "True"
+        result = child_cold(flag) if mode == "cold" else child_fork(flag)
+        print(json.dumps(result))
+        return
+
+    env = dict(os.environ)
+    env["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "startup.db")
+    env.setdefault("SECRET_KEY", "benchmark-secret-key-of-sufficient-length")
+    env["PYTHONWARNINGS"] = "ignore"
+    setup_database(env)
+
+    print("%-22s %-18s %9s %9s %9s" % ("run", "measure", "median", "min", "max"))
+    summarize("cold, no warm-up", run_child(env, "cold", False, args.repeat))
+    summarize("cold, warm-up", run_child(env, "cold", True, args.repeat))
+    summarize("fork, load in worker", run_child(env, "fork", False, args.repeat))
+    summarize("fork, preloaded", run_child(env, "fork", True, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,110 @@ load_dotenv()
 class Config:
   SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL')
   JWT_SECRET_KEY = os.environ.get('SECRET_KEY')
+  # lifetimes in seconds of access tokens and of the refresh tokens that renew
+  # them through /refresh
+  JWT_ACCESS_TOKEN_EXPIRES = int(os.environ.get('JWT_ACCESS_TOKEN_EXPIRES', 15 * 60))
+  JWT_REFRESH_TOKEN_EXPIRES = int(os.environ.get('JWT_REFRESH_TOKEN_EXPIRES', 30 * 24 * 60 * 60))
+  # tokens revoked by /logout are looked up in a per process Bloom filter
+  # sized for REVOCATION_BLOOM_CAPACITY tokens, refreshed from the database
+  # every REVOCATION_SYNC_INTERVAL seconds
+  REVOCATION_BLOOM_CAPACITY = int(os.environ.get('REVOCATION_BLOOM_CAPACITY', 100000))
+  REVOCATION_BLOOM_ERROR_RATE = float(os.environ.get('REVOCATION_BLOOM_ERROR_RATE', 0.001))
+  REVOCATION_SYNC_INTERVAL = float(os.environ.get('REVOCATION_SYNC_INTERVAL', 5))
   SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+  # connection pool of every process: DB_POOL_SIZE kept open plus up to
+  # DB_MAX_OVERFLOW more, checkouts give up after DB_POOL_TIMEOUT seconds.
+  # Connections older than DB_POOL_RECYCLE seconds are replaced and pre-ping
+  # drops ones the server closed (e.g. after a failover). DB_POOL_MODE=null
+  # opens a connection per checkout, for PgBouncer in transaction mode
+  DB_POOL_MODE = os.environ.get('DB_POOL_MODE', 'queue').lower()
+  DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+  DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+  DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+  DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+  DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
+  # create_app() configures the mappers and builds the URL map up front, and
+  # gunicorn workers open WARM_UP_CONNECTIONS connections per database before
+  # taking requests
+  WARM_UP = os.environ.get('WARM_UP', 'true').lower() == 'true'
+  WARM_UP_CONNECTIONS = int(os.environ.get('WARM_UP_CONNECTIONS', 2))
+  # optional read replica, read only GET routes query it instead of the primary
+  REPLICA_DATABASE_URL = os.environ.get('REPLICA_DATABASE_URL')
+
+  # JSON responses: 'auto' encodes with orjson when installed ('orjson'
+  # requires it, 'json' always uses the standard library). Datetimes are
+  # written as HTTP dates unless JSON_DATETIME_FORMAT is 'iso'
+  JSON_BACKEND = os.environ.get('JSON_BACKEND', 'auto').lower()
+  JSON_COMPACT = os.environ.get('JSON_COMPACT', 'true').lower() == 'true'
+  JSON_DATETIME_FORMAT = os.environ.get('JSON_DATETIME_FORMAT', 'http').lower()
+
+  # opt-in per request SQL statistics (response headers, slow query log)
+  SQL_INSTRUMENTATION = os.environ.get('SQL_INSTRUMENTATION', 'false').lower() == 'true'
+  SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 200))
+  SQL_SLOWEST_STATEMENTS = int(os.environ.get('SQL_SLOWEST_STATEMENTS', 5))
+  # token expected in the X-Debug-Token header by the /debug endpoints,
+  # the endpoints answer 404 while it is not set
+  DEBUG_TOKEN = os.environ.get('DEBUG_TOKEN')
+
+  # password hashes are computed on a process pool of PASSWORD_HASH_WORKERS
+  # processes (0 hashes on the request thread). Once PASSWORD_HASH_MAX_PENDING
+  # hashes are queued, /signup and /signin answer 503 with a Retry-After header
+  PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:260000')
+  PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+  PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 8))
+  PASSWORD_HASH_TIMEOUT = float(os.environ.get('PASSWORD_HASH_TIMEOUT', 5))
+  PASSWORD_HASH_RETRY_AFTER = int(os.environ.get('PASSWORD_HASH_RETRY_AFTER', 1))
+
+  # per process cache of the users behind JWT identities (entries, seconds)
+  USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE', 1024))
+  USER_CACHE_TTL = float(os.environ.get('USER_CACHE_TTL', 60))
+
+  # task and invitation listings: page sizes for ?limit=&cursor= requests and
+  # the row cap of requests without them
+  PAGINATION_DEFAULT_LIMIT = int(os.environ.get('PAGINATION_DEFAULT_LIMIT', 50))
+  PAGINATION_MAX_LIMIT = int(os.environ.get('PAGINATION_MAX_LIMIT', 500))
+  UNPAGINATED_MAX_ROWS = int(os.environ.get('UNPAGINATED_MAX_ROWS', 1000))
+  # rows fetched per round trip by the streaming task export
+  EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 1000))
+
+  # per process cache of rendered organization, task and invitation responses
+  ORG_RESPONSE_CACHE_SIZE = int(os.environ.get('ORG_RESPONSE_CACHE_SIZE', 512))
+  ORG_RESPONSE_CACHE_TTL = float(os.environ.get('ORG_RESPONSE_CACHE_TTL', 300))
+
+  # per process cache of the roles checked by the organization routes, kept
+  # until the organization's members change (entries, seconds)
+  MEMBERSHIP_CACHE_SIZE = int(os.environ.get('MEMBERSHIP_CACHE_SIZE', 4096))
+  MEMBERSHIP_CACHE_TTL = float(os.environ.get('MEMBERSHIP_CACHE_TTL', 300))
+
+  # flask archive-invitations: age in days of the answered invitations it moves
+  # out of pending_invitations and rows moved per transaction
+  INVITATION_ARCHIVE_AGE_DAYS = float(os.environ.get('INVITATION_ARCHIVE_AGE_DAYS', 30))
+  INVITATION_ARCHIVE_BATCH_SIZE = int(os.environ.get('INVITATION_ARCHIVE_BATCH_SIZE', 500))
+
+  # largest list of ids accepted by GET /users?user_ids=
+  MAX_USER_IDS = int(os.environ.get('MAX_USER_IDS', 500))
+  # GET /users/search: shortest accepted email prefix, default and largest
+  # number of results
+  USER_SEARCH_MIN_PREFIX = int(os.environ.get('USER_SEARCH_MIN_PREFIX', 2))
+  USER_SEARCH_DEFAULT_LIMIT = int(os.environ.get('USER_SEARCH_DEFAULT_LIMIT', 10))
+  USER_SEARCH_MAX_LIMIT = int(os.environ.get('USER_SEARCH_MAX_LIMIT', 50))
+  # largest list of emails accepted by POST /organizations/<id>/invitations
+  MAX_BULK_INVITATIONS = int(os.environ.get('MAX_BULK_INVITATIONS', 1000))
+  # largest list of operations accepted by POST /organizations/<id>/tasks/batch
+  MAX_BATCH_TASK_OPERATIONS = int(os.environ.get('MAX_BATCH_TASK_OPERATIONS', 1000))
+
+  # organization event streams: broker class ('auto' relays events between
+  # processes with pubsub.PostgresBroker on PostgreSQL and keeps them in the
+  # process with pubsub.InProcessBroker otherwise), messages buffered per
+  # subscriber and open streams allowed per process. Under gunicorn every
+  # stream holds a thread, a worker keeps SSE_RESERVED_THREADS of its threads
+  # for the other requests
+  PUBSUB_BROKER = os.environ.get('PUBSUB_BROKER', 'auto')
+  PUBSUB_QUEUE_SIZE = int(os.environ.get('PUBSUB_QUEUE_SIZE', 100))
+  PUBSUB_MAX_SUBSCRIBERS = int(os.environ.get('PUBSUB_MAX_SUBSCRIBERS', 1000))
+  SSE_RESERVED_THREADS = int(os.environ.get('SSE_RESERVED_THREADS', 8))
+  SSE_HEARTBEAT_SECONDS = float(os.environ.get('SSE_HEARTBEAT_SECONDS', 15))
+  SSE_RETRY_AFTER = int(os.environ.get('SSE_RETRY_AFTER', 5))
+
 
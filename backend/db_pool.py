@@ -0,0 +1,128 @@
+# database connection pool settings from the DB_POOL_* config and a QueuePool
+# recording how long checkouts wait for a connection
+import os
+import threading
+import time
+import weakref
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import NullPool, QueuePool
+
+
+class TimedQueuePool(QueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self._stats_lock = threading.Lock()
+
+    # the wait includes opening a new connection when the pool has none idle
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            wait_ms = (time.perf_counter() - start) * 1000
+            with self._stats_lock:
+                self.checkouts += 1
+                self.total_wait_ms += wait_ms
+                self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "total_wait_ms": self.total_wait_ms,
+                "max_wait_ms": self.max_wait_ms,
+                "avg_wait_ms": (
+                    self.total_wait_ms / self.checkouts if self.checkouts else 0.0
+                ),
+            }
+
+
+# SQLALCHEMY_ENGINE_OPTIONS for the configured pool. "null" opens a connection
+# per checkout, for running behind PgBouncer in transaction mode. In-memory
+# SQLite keeps the single shared connection Flask-SQLAlchemy sets up for it
+def engine_options(config, uri):
+    if not uri:
+        return {}
+
+    url = make_url(uri)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+
+    if config["DB_POOL_MODE"] == "null":
+        return {"poolclass": NullPool, "pool_pre_ping": config["DB_POOL_PRE_PING"]}
+
+    return {
+        "poolclass": TimedQueuePool,
+        "pool_size": config["DB_POOL_SIZE"],
+        "max_overflow": config["DB_MAX_OVERFLOW"],
+        "pool_timeout": config["DB_POOL_TIMEOUT"],
+        "pool_recycle": config["DB_POOL_RECYCLE"],
+        "pool_pre_ping": config["DB_POOL_PRE_PING"],
+    }
+
+
+def pool_stats(engine):
+    pool = engine.pool
+    stats = {"pool": type(pool).__name__, "status": pool.status()}
+
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            max_overflow=pool._max_overflow,
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+            timeout=pool.timeout(),
+        )
+    if isinstance(pool, TimedQueuePool):
+        stats.update(pool.stats())
+    return stats
+
+
+# engines of the apps created in this process. A worker forked from a
+# preloaded app must not use the connections it inherited, the parent's
+# sockets would be shared between processes. dispose(close=False) gives the
+# child fresh pools without closing the parent's connections
+_engines = weakref.WeakSet()
+
+
+def _dispose_inherited_pools():
+    for engine in list(_engines):
+        engine.dispose(close=False)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_dispose_inherited_pools)
+
+
+def dispose_after_fork(engines):
+    _engines.update(engines)
+
+
+# opens up to count pooled connections and returns them to the pool, so the
+# first requests do not pay for connecting
+def pre_connect(engine, count):
+    if isinstance(engine.pool, NullPool):
+        return 0
+    if isinstance(engine.pool, QueuePool):
+        count = min(count, engine.pool.size())
+
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(engine.connect())
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
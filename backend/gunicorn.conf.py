@@ -0,0 +1,48 @@
+# gunicorn settings, run from the backend folder with
+#   gunicorn --config gunicorn.conf.py
+# The app is created once in the master (preload) and forked into the
+# workers, which share its imported modules and configured mappers
+# copy-on-write. Every worker replaces the inherited connection pools (see
+# db_pool.py) and opens its own connections before it accepts requests
+import os
+
+wsgi_app = "app:create_app()"
+preload_app = True
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+# every /organizations/<id>/events stream holds one of a worker's threads for
+# as long as it is open. post_worker_init caps the streams of a worker so that
+# SSE_RESERVED_THREADS threads are left for the other requests
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 32))
+
+
+# the in-process broker only reaches the streams of the worker that made the
+# change, with more workers clients would miss events
+def on_starting(server):
+    broker = server.app.wsgi().extensions["pubsub"]
+    if server.cfg.workers > 1 and not broker.cross_process:
+        raise RuntimeError(
+            "%s does not deliver events between %d workers, set PUBSUB_BROKER "
+            "to a cross process broker or run a single worker"
+            % (type(broker).__name__, server.cfg.workers)
+        )
+
+
+def post_worker_init(worker):
+    from app import warm_up_connections
+
+    app = worker.wsgi
+    broker = app.extensions["pubsub"]
+    broker.max_subscribers = min(
+        broker.max_subscribers,
+        max(worker.cfg.threads - app.config["SSE_RESERVED_THREADS"], 0),
+    )
+    worker.log.info(
+        "worker %s serves up to %d event streams", worker.pid, broker.max_subscribers
+    )
+
+    if app.config["WARM_UP"]:
+        opened = warm_up_connections(app)
+        worker.log.info("worker %s opened %d connections", worker.pid, opened)
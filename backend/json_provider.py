@@ -0,0 +1,117 @@
+# JSON provider encoding responses with orjson when it is installed, and with
+# the standard library otherwise. Datetimes keep Flask's HTTP date format by
+# default since the frontend parses completed_at in that form
+import dataclasses
+import decimal
+import json
+import uuid
+from datetime import date, datetime, timezone
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+MONTHS = (
+    "Jan",
+    "Feb",
+    "Mar",
+    "Apr",
+    "May",
+    "Jun",
+    "Jul",
+    "Aug",
+    "Sep",
+    "Oct",
+    "Nov",
+    "Dec",
+)
+
+
+# same output as werkzeug's http_date (naive datetimes are UTC) without going
+# through email.utils, which dominates encoding task lists
+def http_date(value):
+    if not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    elif value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return "%s, %02d %s %04d %02d:%02d:%02d GMT" % (
+        WEEKDAYS[value.weekday()],
+        value.day,
+        MONTHS[value.month - 1],
+        value.year,
+        value.hour,
+        value.minute,
+        value.second,
+    )
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    def __init__(self, app):
+        super().__init__(app)
+        backend = app.config["JSON_BACKEND"]
+        if backend == "orjson" and orjson is None:
+            raise RuntimeError("JSON_BACKEND is orjson but orjson is not installed")
+
+        self.use_orjson = orjson is not None and backend in ("auto", "orjson")
+        self.compact = app.config["JSON_COMPACT"]
+        self.iso_datetimes = app.config["JSON_DATETIME_FORMAT"] == "iso"
+        self.sort_keys = False
+
+    def default(self, o):
+        if isinstance(o, date):
+            return o.isoformat() if self.iso_datetimes else http_date(o)
+        if isinstance(o, decimal.Decimal):
+            return str(o)
+        if isinstance(o, uuid.UUID):
+            return str(o)
+        if dataclasses.is_dataclass(o) and not isinstance(o, type):
+            return dataclasses.asdict(o)
+        if hasattr(o, "__html__"):
+            return str(o.__html__())
+        raise TypeError("Object of type %s is not JSON serializable" % type(o).__name__)
+
+    def _orjson_options(self):
+        options = orjson.OPT_NON_STR_KEYS
+        if not self.iso_datetimes:
+            options |= orjson.OPT_PASSTHROUGH_DATETIME
+        if not self.compact:
+            options |= orjson.OPT_INDENT_2
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return options
+
+    def dumps_bytes(self, obj):
+        if self.use_orjson:
+            return orjson.dumps(
+                obj, default=self.default, option=self._orjson_options()
+            )
+        return self.dumps(obj).encode()
+
+    def dumps(self, obj, **kwargs):
+        if self.use_orjson and not kwargs:
+            return self.dumps_bytes(obj).decode()
+
+        kwargs.setdefault("default", self.default)
+        kwargs.setdefault("ensure_ascii", False)
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        if self.compact:
+            kwargs.setdefault("separators", (",", ":"))
+        else:
+            kwargs.setdefault("indent", 2)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if self.use_orjson and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            self.dumps_bytes(obj) + b"\n", mimetype=self.mimetype
+        )
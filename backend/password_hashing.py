@@ -0,0 +1,137 @@
+# runs pbkdf2 password hashing on a bounded process pool, so a burst of
+# signups/signins cannot tie up the request threads with CPU work
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+logger = logging.getLogger(__name__)
+
+
+class HashingPoolBusy(Exception):
+    pass
+
+
+class PasswordHasher:
+    def __init__(self):
+        self.method = "pbkdf2:sha256:260000"
+        self.workers = 0
+        self.max_pending = 0
+        self.timeout = None
+        self._pid = None
+        self._executor = None
+        self._slots = None
+        self._writer_pid = None
+        self._writer = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.method = app.config["PASSWORD_HASH_METHOD"]
+        self.workers = app.config["PASSWORD_HASH_WORKERS"]
+        self.max_pending = app.config["PASSWORD_HASH_MAX_PENDING"]
+        self.timeout = app.config["PASSWORD_HASH_TIMEOUT"]
+
+    # the pool is created lazily and again in every forked worker process,
+    # a pool inherited through fork would point at the parent's processes
+    def _get_pool(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                self._slots = threading.BoundedSemaphore(self.max_pending)
+            return self._executor, self._slots
+
+    # runs the rehash callbacks, which write to the database. The done
+    # callbacks of the process pool run on its management thread, blocking it
+    # on a database connection would hold back every other hash result
+    def _get_writer(self):
+        with self._lock:
+            if self._writer_pid != os.getpid():
+                self._writer_pid = os.getpid()
+                self._writer = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="rehash-writer"
+                )
+            return self._writer
+
+    # a pool stays broken once one of its processes died (killed by the OOM
+    # killer, crashed), the first caller to notice drops it and the next
+    # _get_pool starts a new one
+    def _drop_pool(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._pid = None
+                self._executor = None
+                self._slots = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, executor, slots, fn, *args):
+        if not slots.acquire(blocking=False):
+            raise HashingPoolBusy()
+
+        try:
+            future = executor.submit(fn, *args)
+        except BrokenProcessPool:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+        return future
+
+    # retries once on a new pool when the current one is broken, a pool that
+    # breaks again answers 503 instead of failing the request
+    def _run(self, fn, *args):
+        if not self.workers:
+            return fn(*args)
+
+        for _ in range(2):
+            executor, slots = self._get_pool()
+            try:
+                future = self._submit(executor, slots, fn, *args)
+                return future.result(timeout=self.timeout)
+            except FutureTimeoutError:
+                raise HashingPoolBusy()
+            except BrokenProcessPool:
+                logger.warning("Password hashing pool is broken, starting a new one")
+                self._drop_pool(executor)
+        raise HashingPoolBusy()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, pwhash, password):
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        return pwhash.split("$", 1)[0] != self.method
+
+    # hashes the password with the current method without waiting for the
+    # result, on_hashed receives the new hash on the writer thread once it is
+    # ready. Skipped when the pool is full, the next sign in will try again
+    def rehash_in_background(self, password, on_hashed):
+        if not self.workers:
+            on_hashed(generate_password_hash(password, self.method))
+            return
+
+        executor, slots = self._get_pool()
+        try:
+            future = self._submit(
+                executor, slots, generate_password_hash, password, self.method
+            )
+        except HashingPoolBusy:
+            return
+        except BrokenProcessPool:
+            self._drop_pool(executor)
+            return
+
+        writer = self._get_writer()
+
+        def store(future):
+            try:
+                on_hashed(future.result())
+            except Exception:
+                logger.exception("Failed to store rehashed password")
+
+        future.add_done_callback(lambda future: writer.submit(store, future))
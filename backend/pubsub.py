@@ -0,0 +1,235 @@
+# publish/subscribe for the organization event streams. The broker class is
+# configured with PUBSUB_BROKER. InProcessBroker only delivers messages
+# published by the same process, PostgresBroker relays them between processes
+# with LISTEN/NOTIFY
+import logging
+import os
+import queue
+import select
+import threading
+import time
+
+from sqlalchemy.engine import make_url
+
+try:
+    import psycopg2
+except ImportError:
+    psycopg2 = None
+
+logger = logging.getLogger(__name__)
+
+
+class TooManySubscribers(Exception):
+    pass
+
+
+class Subscription:
+    def __init__(self, broker, channel, maxsize):
+        self.broker = broker
+        self.channel = channel
+        self.overflowed = False
+        self._queue = queue.Queue(maxsize)
+
+    # next message, raises queue.Empty after timeout seconds without one
+    def get(self, timeout):
+        return self._queue.get(timeout=timeout)
+
+    # a subscriber that does not keep up stops receiving messages instead of
+    # growing its queue, it has to resync and subscribe again
+    def put(self, message):
+        if self.overflowed:
+            return
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            self.overflowed = True
+
+    # the subscriber missed messages and has to resync
+    def resync(self):
+        self.overflowed = True
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class Broker:
+    # whether subscribers receive messages published by other processes
+    cross_process = False
+
+    def init_app(self, app):
+        pass
+
+    def publish(self, channel, message):
+        raise NotImplementedError
+
+    def subscribe(self, channel):
+        raise NotImplementedError
+
+    def unsubscribe(self, subscription):
+        raise NotImplementedError
+
+
+class InProcessBroker(Broker):
+    def __init__(self):
+        self.queue_size = 100
+        self.max_subscribers = 1000
+        self._channels = {}
+        self._subscribers = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.queue_size = app.config["PUBSUB_QUEUE_SIZE"]
+        self.max_subscribers = app.config["PUBSUB_MAX_SUBSCRIBERS"]
+
+    def publish(self, channel, message):
+        for subscription in self._subscriptions(channel):
+            subscription.put(message)
+
+    def _subscriptions(self, channel=None):
+        with self._lock:
+            if channel is not None:
+                return list(self._channels.get(channel, ()))
+            return [
+                s for subscriptions in self._channels.values() for s in subscriptions
+            ]
+
+    def subscribe(self, channel):
+        with self._lock:
+            if self._subscribers >= self.max_subscribers:
+                raise TooManySubscribers()
+            subscription = Subscription(self, channel, self.queue_size)
+            self._channels.setdefault(channel, set()).add(subscription)
+            self._subscribers += 1
+            return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._channels.get(subscription.channel)
+            if subscriptions and subscription in subscriptions:
+                subscriptions.remove(subscription)
+                self._subscribers -= 1
+                if not subscriptions:
+                    del self._channels[subscription.channel]
+
+
+# every process LISTENs on one channel and hands the notifications to its own
+# subscribers. Messages are published on a separate autocommit connection once
+# the transaction that caused them committed. Connections are opened on first
+# use so that none is shared with the workers forked from a preloaded master
+class PostgresBroker(InProcessBroker):
+    cross_process = True
+    notify_channel = "organization_events"
+    # NOTIFY payloads are limited to 8000 bytes
+    max_payload = 7999
+    reconnect_delay = 1
+
+    def __init__(self):
+        super().__init__()
+        self.dsn = None
+        self._pid = None
+        self._publisher = None
+        self._listener = None
+        self._connection_lock = threading.Lock()
+
+    def init_app(self, app):
+        if psycopg2 is None:
+            raise RuntimeError("PostgresBroker requires psycopg2")
+        super().init_app(app)
+        url = make_url(app.config["SQLALCHEMY_DATABASE_URI"])
+        self.dsn = url.set(drivername="postgresql").render_as_string(
+            hide_password=False
+        )
+
+    def publish(self, channel, message):
+        payload = "%s\n%s" % (channel, message)
+        # a message that does not fit is replaced by an empty one, the
+        # receiving processes make the channel's subscribers resync
+        if len(payload.encode()) > self.max_payload:
+            payload = "%s\n" % channel
+
+        with self._connection_lock:
+            self._check_process()
+            for attempt in range(2):
+                try:
+                    if self._publisher is None or self._publisher.closed:
+                        self._publisher = self._connect()
+                    with self._publisher.cursor() as cursor:
+                        cursor.execute(
+                            "SELECT pg_notify(%s, %s)", (self.notify_channel, payload)
+                        )
+                    return
+                except psycopg2.Error:
+                    # retried once on a new connection, e.g. after a restart
+                    # of the server. The change itself is already committed
+                    self._close_publisher()
+                    if attempt:
+                        logger.exception("could not publish to %s", channel)
+
+    def subscribe(self, channel):
+        subscription = super().subscribe(channel)
+        with self._connection_lock:
+            self._check_process()
+            if self._listener is None:
+                self._listener = threading.Thread(
+                    target=self._listen, name="pubsub-listener", daemon=True
+                )
+                self._listener.start()
+        return subscription
+
+    def _connect(self):
+        connection = psycopg2.connect(
+            self.dsn,
+            keepalives=1,
+            keepalives_idle=30,
+            keepalives_interval=10,
+            keepalives_count=3,
+        )
+        connection.autocommit = True
+        return connection
+
+    def _close_publisher(self):
+        if self._publisher is not None:
+            try:
+                self._publisher.close()
+            except psycopg2.Error:
+                pass
+            self._publisher = None
+
+    # connections and the listener thread of the parent do not carry over
+    # into a forked child
+    def _check_process(self):
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._publisher = None
+            self._listener = None
+
+    def _listen(self):
+        while True:
+            connection = None
+            try:
+                connection = self._connect()
+                with connection.cursor() as cursor:
+                    cursor.execute("LISTEN " + self.notify_channel)
+                while True:
+                    if select.select([connection], [], [], 60)[0]:
+                        connection.poll()
+                    while connection.notifies:
+                        channel, _, message = connection.notifies.pop(
+                            0
+                        ).payload.partition("\n")
+                        if message:
+                            InProcessBroker.publish(self, channel, message)
+                        else:
+                            self._resync(channel)
+            except (psycopg2.Error, OSError):
+                logger.exception("lost the %s listener connection", self.notify_channel)
+                # messages sent while disconnected are lost
+                self._resync()
+                time.sleep(self.reconnect_delay)
+            finally:
+                if connection is not None and not connection.closed:
+                    connection.close()
+
+    def _resync(self, channel=None):
+        for subscription in self._subscriptions(channel):
+            subscription.resync()
@@ -0,0 +1,34 @@
+# read replica routing. Sessions flagged with info["replica_reads"] send their
+# reads to the "replica" bind. Writes, flushes and SELECT ... FOR UPDATE go to
+# the primary, and from then on the session stays on the primary so it reads
+# its own writes
+from flask_sqlalchemy.session import Session
+
+REPLICA_BIND = "replica"
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and self.info.get("replica_reads")
+            and not self.info.get("primary_only")
+        ):
+            if (
+                self._flushing
+                or getattr(clause, "is_dml", False)
+                or getattr(clause, "_for_update_arg", None) is not None
+            ):
+                self.info["primary_only"] = True
+            elif REPLICA_BIND in self._db.engines:
+                return self._db.engines[REPLICA_BIND]
+
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+# SQLALCHEMY_BINDS entry of the replica, with the same pool options as the
+# primary
+def replica_binds(url, options):
+    if not url:
+        return {}
+    return {REPLICA_BIND: {"url": url, **options}}
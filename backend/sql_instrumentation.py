@@ -0,0 +1,136 @@
+# per request SQL statistics: statement count, DB time and slowest statements,
+# collected from SQLAlchemy engine events and reported per request and per route
+import heapq
+import json
+import logging
+import threading
+import time
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+slow_query_logger = logging.getLogger("sql.slow_queries")
+
+
+class SQLInstrumentation:
+    def __init__(self):
+        self.slow_query_threshold_ms = 200.0
+        self.slowest_statements = 5
+        self._route_stats = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app, engines):
+        self.slow_query_threshold_ms = app.config["SLOW_QUERY_THRESHOLD_MS"]
+        self.slowest_statements = app.config["SQL_SLOWEST_STATEMENTS"]
+
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", self._before_execute)
+            event.listen(engine, "after_cursor_execute", self._after_execute)
+            event.listen(engine, "handle_error", self._execute_failed)
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+
+    def _start_request(self):
+        g.sql_stats = {"count": 0, "duration_ms": 0.0, "slowest": []}
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, many):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    def _execute_failed(self, exception_context):
+        if exception_context.connection is not None:
+            start_times = exception_context.connection.info.get("query_start_time")
+            if start_times:
+                start_times.pop()
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, many):
+        duration_ms = (time.perf_counter() - conn.info["query_start_time"].pop()) * 1000
+
+        if not has_request_context() or "sql_stats" not in g:
+            return
+
+        stats = g.sql_stats
+        stats["count"] += 1
+        stats["duration_ms"] += duration_ms
+
+        # min-heap holding the N slowest statements of the request
+        entry = (duration_ms, stats["count"], statement)
+        if len(stats["slowest"]) < self.slowest_statements:
+            heapq.heappush(stats["slowest"], entry)
+        else:
+            heapq.heappushpop(stats["slowest"], entry)
+
+        if duration_ms >= self.slow_query_threshold_ms:
+            slow_query_logger.warning(
+                json.dumps(
+                    {
+                        "event": "slow_query",
+                        "duration_ms": round(duration_ms, 2),
+                        "method": request.method,
+                        "route": _route_name(),
+                        "statement": statement,
+                    }
+                )
+            )
+
+    def _finish_request(self, response):
+        stats = g.pop("sql_stats", None)
+        if stats is None:
+            return response
+
+        response.headers["X-DB-Query-Count"] = str(stats["count"])
+        response.headers.add(
+            "Server-Timing",
+            'db;dur=%.2f;desc="%d queries"' % (stats["duration_ms"], stats["count"]),
+        )
+
+        key = "%s %s" % (request.method, _route_name())
+        with self._lock:
+            route = self._route_stats.setdefault(
+                key,
+                {
+                    "requests": 0,
+                    "queries": 0,
+                    "db_time_ms": 0.0,
+                    "max_queries": 0,
+                    "max_db_time_ms": 0.0,
+                    "slowest_statements": [],
+                },
+            )
+            route["requests"] += 1
+            route["queries"] += stats["count"]
+            route["db_time_ms"] += stats["duration_ms"]
+            route["max_queries"] = max(route["max_queries"], stats["count"])
+            route["max_db_time_ms"] = max(route["max_db_time_ms"], stats["duration_ms"])
+            route["slowest_statements"] = heapq.nlargest(
+                self.slowest_statements,
+                route["slowest_statements"]
+                + [
+                    (duration, statement) for duration, _, statement in stats["slowest"]
+                ],
+            )
+
+        return response
+
+    def route_stats(self):
+        with self._lock:
+            return {
+                key: {
+                    "requests": route["requests"],
+                    "queries": route["queries"],
+                    "avg_queries": route["queries"] / route["requests"],
+                    "max_queries": route["max_queries"],
+                    "db_time_ms": round(route["db_time_ms"], 2),
+                    "avg_db_time_ms": round(route["db_time_ms"] / route["requests"], 2),
+                    "max_db_time_ms": round(route["max_db_time_ms"], 2),
+                    "slowest_statements": [
+                        {"duration_ms": round(duration, 2), "statement": statement}
+                        for duration, statement in route["slowest_statements"]
+                    ],
+                }
+                for key, route in self._route_stats.items()
+            }
+
+
+def _route_name():
+    return request.url_rule.rule if request.url_rule else request.path
@@ -0,0 +1,105 @@
+# per process view of the revoked_token table. Every request's token is
+# checked against a Bloom filter, only a possible match costs a query. The
+# filter is filled from the table incrementally: every sync reads the rows
+# revoked since the newest one seen, minus an overlap for transactions that
+# committed late
+import threading
+import time
+from datetime import timedelta
+
+from bloom import BloomFilter
+
+
+class TokenBlocklist:
+    def __init__(self):
+        self.capacity = 100000
+        self.error_rate = 0.001
+        self.sync_interval = 5
+        self.sync_overlap = timedelta(seconds=60)
+        self.filter = BloomFilter(self.capacity, self.error_rate)
+        self.synced_until = None
+        self.synced_at = None
+        self.syncs = 0
+        self.rebuilds = 0
+        self.lookups = 0
+        self.filter_hits = 0
+        self._sync_lock = threading.Lock()
+
+    def init_app(self, app):
+        self.capacity = app.config["REVOCATION_BLOOM_CAPACITY"]
+        self.error_rate = app.config["REVOCATION_BLOOM_ERROR_RATE"]
+        self.sync_interval = app.config["REVOCATION_SYNC_INTERVAL"]
+        self.filter = BloomFilter(self.capacity, self.error_rate)
+        self.synced_until = None
+        self.synced_at = None
+
+    # load_since(since) returns (jti, revoked_at) rows of unexpired tokens
+    # revoked at or after since, all of them when since is None. Only one
+    # thread syncs at a time, the others keep using the filter as it is
+    def sync(self, load_since, force=False):
+        now = time.monotonic()
+        if (
+            not force
+            and self.synced_at is not None
+            and now - self.synced_at < self.sync_interval
+        ):
+            return
+        if not self._sync_lock.acquire(blocking=False):
+            return
+
+        try:
+            if self.filter.count > self.capacity:
+                self._rebuild(load_since)
+            else:
+                since = self.synced_until and self.synced_until - self.sync_overlap
+                self.synced_until = self._load(
+                    self.filter, load_since(since), self.synced_until
+                )
+            self.synced_at = now
+            self.syncs += 1
+        finally:
+            self._sync_lock.release()
+
+    def _load(self, bloom_filter, rows, synced_until):
+        for jti, revoked_at in rows:
+            if jti not in bloom_filter:
+                bloom_filter.add(jti)
+            if synced_until is None or revoked_at > synced_until:
+                synced_until = revoked_at
+        return synced_until
+
+    # past its capacity the filter's error rate grows, it is rebuilt from the
+    # tokens that did not expire yet (at twice the capacity if they still do
+    # not fit) and swapped in once complete
+    def _rebuild(self, load_since):
+        rows = list(load_since(None))
+        while len(rows) > self.capacity:
+            self.capacity *= 2
+        bloom_filter = BloomFilter(self.capacity, self.error_rate)
+        synced_until = self._load(bloom_filter, rows, None)
+        self.filter, self.synced_until = bloom_filter, synced_until
+        self.rebuilds += 1
+
+    # tokens revoked by this process are blocked without waiting for a sync
+    def add(self, jti):
+        if jti not in self.filter:
+            self.filter.add(jti)
+
+    # False means the token is certainly not revoked, True that it may be
+    def might_be_revoked(self, jti):
+        self.lookups += 1
+        if jti in self.filter:
+            self.filter_hits += 1
+            return True
+        return False
+
+    def stats(self):
+        return {
+            "revoked_tokens": self.filter.count,
+            "capacity": self.capacity,
+            "error_rate": self.error_rate,
+            "syncs": self.syncs,
+            "rebuilds": self.rebuilds,
+            "lookups": self.lookups,
+            "filter_hits": self.filter_hits,
+        }
@@ -1,5 +1,6 @@
 import React, { useEffect, useState } from "react";
 import { useNavigate } from "react-router-dom";
+import { signOut } from "../utils/auth";
 import { fetchUserData } from "../utils/userData";
 
 export default function Navbar() {
@@ -23,8 +24,8 @@ export default function Navbar() {
     }
   }, [accessToken]);
 
-  const handleSignOut = () => {
-    localStorage.removeItem("access_token");
+  const handleSignOut = async () => {
+    await signOut();
     setUser("");
     navigate("/");
   };
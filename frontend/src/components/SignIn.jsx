@@ -16,8 +16,9 @@ export default function SignIn() {
         { email, password }
       );
 
-      const { access_token } = response.data;
+      const { access_token, refresh_token } = response.data;
       localStorage.setItem("access_token", access_token);
+      localStorage.setItem("refresh_token", refresh_token);
       navigate("/");
     } catch (err) {
       console.error("Sign In failed! ->", err.message);
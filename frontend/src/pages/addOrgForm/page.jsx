@@ -1,11 +1,11 @@
 import React, { useState } from "react";
 import { useNavigate } from "react-router-dom";
+import { createOrganization } from "../../utils/orgData";
 
 export default function AddOrgForm() {
   const navigate = useNavigate();
   const [orgName, setOrgName] = useState("");
   const [coOwners, setCoOwners] = useState("");
-  const accessToken = localStorage.getItem("access_token");
 
   const handleAddOrganization = async (e) => {
     e.preventDefault();
@@ -17,27 +17,9 @@ export default function AddOrgForm() {
       owners,
     };
 
-    try {
-      const response = await fetch(
-        `${process.env.REACT_APP_API_PATH}/organizations`,
-        {
-          method: "POST",
-          headers: {
-            "Content-Type": "application/json",
-            Authorization: `Bearer ${accessToken}`,
-          },
-          body: JSON.stringify(data),
-        }
-      );
-
-      if (response.status === 201) {
-        console.log("Organization added successfully");
-        navigate("/");
-      } else {
-        console.error("Failed to add organization");
-      }
-    } catch (error) {
-      console.error("API request failed", error);
+    if (await createOrganization(data)) {
+      console.log("Organization added successfully");
+      navigate("/");
     }
   };
 
@@ -5,20 +5,20 @@ import {
   deleteEmployee,
   deleteOrganizationInvitation,
   demoteAdmin,
-  fetchOrganizationData,
-  fetchOrganizationInvitations,
+  fetchOrganizationDashboard,
   promoteEmployee,
   sendInvitation,
   updateOrganization,
 } from "../../utils/orgData";
-import { fetchUserData, fetchUsersDataById } from "../../utils/userData";
 import {
   addTaskData,
   deleteTask,
+  fetchTaskStats,
   fetchTasksData,
   markCompleteTask,
   unmarkTask,
 } from "../../utils/taskData";
+import { searchUsers } from "../../utils/userData";
 
 export default function OrganizationPage() {
   const { orgId } = useParams();
@@ -27,11 +27,16 @@ export default function OrganizationPage() {
   const [owners, setOwners] = useState([]);
   const [orgInvitations, setOrgInvitations] = useState(null);
   const [tasks, setTasks] = useState([]);
+  const [taskFilters, setTaskFilters] = useState({
+    completed: "",
+    sort: "",
+    q: "",
+  });
+  const [taskStats, setTaskStats] = useState(null);
   const [activeTab, setActiveTab] = useState("tasks");
 
   const [isOwner, setIsOwner] = useState(false);
   const [isAdmin, setIsAdmin] = useState(false);
-  const [user, setUser] = useState("");
   const accessToken = localStorage.getItem("access_token");
 
   const handleTabClick = (tab) => {
@@ -92,7 +97,40 @@ export default function OrganizationPage() {
     });
   };
 
+  const showTasks = (tasksData) => {
+    if (tasksData.length > 0) {
+      const tasksWithWasToggled = tasksData.map((task) => ({
+        ...task,
+        wasToggled: task.completed,
+        isDeleted: false,
+      }));
+      setTasks(tasksWithWasToggled);
+    } else {
+      setTasks(null);
+    }
+  };
+
+  const refreshTaskStats = async () => {
+    const stats = await fetchTaskStats(orgId);
+    if (stats) {
+      setTaskStats(stats);
+    }
+  };
+
+  // empty filters are left out of the query
+  const applyTaskFilters = async (filters) => {
+    setTaskFilters(filters);
+    const params = Object.fromEntries(
+      Object.entries(filters).filter(([, value]) => value)
+    );
+    const tasksData = await fetchTasksData(orgId, params);
+    if (tasksData) {
+      showTasks(tasksData);
+    }
+  };
+
   const updateTaskToggle = (taskId) => {
+    refreshTaskStats();
     setTasks((prevTasks) => {
       return prevTasks.map((task) => {
         if (task.id === taskId) {
@@ -108,6 +146,7 @@ export default function OrganizationPage() {
   };
 
   const updateDeletedTask = (taskId) => {
+    refreshTaskStats();
     setTasks((prevTasks) => {
       return prevTasks.map((task) => {
         if (task.id === taskId) {
@@ -123,101 +162,56 @@ export default function OrganizationPage() {
   };
 
   useEffect(() => {
+    if (!accessToken) {
+      navigate("/");
+      return;
+    }
+
     const fetchData = async () => {
-      const orgData = await fetchOrganizationData(orgId);
-      if (orgData) {
-        const modifiedOrganization = {
-          ...orgData,
-          admins:
-            orgData.admins && orgData.admins.length > 0
-              ? orgData.admins.map((admin) => ({
-                  ...admin,
-                  isDeleted: false,
-                  isDemoted: false,
-                }))
-              : orgData.admins,
-          employees:
-            orgData.employees && orgData.employees.length > 0
-              ? orgData.employees.map((employee) => ({
-                  ...employee,
-                  isDeleted: false,
-                  isPromoted: false,
-                }))
-              : orgData.employees,
-        };
-        setOrganization(modifiedOrganization);
+      const dashboard = await fetchOrganizationDashboard(orgId, accessToken);
+      if (!dashboard) {
+        navigate("/");
+        return;
       }
-      const orgInvs = await fetchOrganizationInvitations(orgId);
-      if (orgInvs) {
-        const orgInvWithFlags = orgInvs.map((inv) => ({
+
+      const orgData = dashboard.organization;
+      const modifiedOrganization = {
+        ...orgData,
+        admins:
+          orgData.admins && orgData.admins.length > 0
+            ? orgData.admins.map((admin) => ({
+                ...admin,
+                isDeleted: false,
+                isDemoted: false,
+              }))
+            : orgData.admins,
+        employees:
+          orgData.employees && orgData.employees.length > 0
+            ? orgData.employees.map((employee) => ({
+                ...employee,
+                isDeleted: false,
+                isPromoted: false,
+              }))
+            : orgData.employees,
+      };
+      setOrganization(modifiedOrganization);
+      setOwners(orgData.owners);
+
+      setOrgInvitations(
+        dashboard.invitations.map((inv) => ({
           ...inv,
           isDeleted: false,
-        }));
-        setOrgInvitations(orgInvWithFlags);
-      } else {
-        setOrgInvitations([]);
-      }
+        }))
+      );
 
-      const tasksData = await fetchTasksData(orgId);
-      if (tasksData.length > 0) {
-        const tasksWithWasToggled = tasksData.map((task) => ({
-          ...task,
-          wasToggled: task.completed,
-          isDeleted: false,
-        }));
-        setTasks(tasksWithWasToggled);
-      } else {
-        setTasks(null);
-      }
+      showTasks(dashboard.tasks);
+      refreshTaskStats();
+
+      setIsOwner(dashboard.role === "owner");
+      setIsAdmin(dashboard.role === "admin");
     };
     fetchData();
-  }, [orgId]);
-
-  useEffect(() => {
-    if (organization && organization.owners) {
-      const fetchData = async () => {
-        const ownerIds = organization.owners.map((owner) => owner.id);
-        const ownersData = await fetchUsersDataById(ownerIds);
-        if (ownersData) {
-          setOwners(ownersData);
-        }
-      };
-      fetchData();
-    }
-  }, [organization]);
-
-  useEffect(() => {
-    if (accessToken) {
-      const fetchData = async () => {
-        const userData = await fetchUserData(accessToken);
-        if (userData) {
-          setUser(userData);
-        } else {
-          setUser("");
-        }
-      };
-      fetchData();
-    } else {
-      setUser(null);
-    }
-  }, [accessToken]);
-
-  useEffect(() => {
-    if (user) {
-      if (organization.admins) {
-        if (organization.admins.some((admin) => admin.id === user.id)) {
-          setIsAdmin(true);
-        }
-      }
-      if (owners) {
-        if (owners.some((owner) => owner.id === user.id)) {
-          setIsOwner(true);
-        }
-      }
-    } else if (user === null) {
-      navigate("/");
-    }
-  }, [user]);
+  }, [orgId, accessToken]);
 
   return (
     <div className="p-8 sm:p-14">
@@ -275,6 +269,9 @@ export default function OrganizationPage() {
                 accessToken={accessToken}
                 updateTaskToggle={updateTaskToggle}
                 updateDeletedTask={updateDeletedTask}
+                taskFilters={taskFilters}
+                applyTaskFilters={applyTaskFilters}
+                taskStats={taskStats}
               />
             )}
             {activeTab === "employees" && (
@@ -287,6 +284,7 @@ export default function OrganizationPage() {
                 }
                 orgId={orgId}
                 isOwner={isOwner}
+                accessToken={accessToken}
               />
             )}
             {activeTab === "options" && (
@@ -323,8 +321,13 @@ function TasksTabContent({
   accessToken,
   updateTaskToggle,
   updateDeletedTask,
+  taskFilters,
+  applyTaskFilters,
+  taskStats,
 }) {
   const [openAccordions, setOpenAccordions] = useState({});
+  const [filters, setFilters] = useState(taskFilters);
+  const isFiltered = Object.values(taskFilters).some((value) => value);
 
   const isAccordionOpen = (accordionId) => !!openAccordions[accordionId];
 
@@ -336,7 +339,7 @@ function TasksTabContent({
   };
 
   const handleUnCheckTask = async (id) => {
-    const result = await unmarkTask(id);
+    const result = await unmarkTask(id, accessToken);
     if (result) {
       updateTaskToggle(id);
     }
@@ -350,14 +353,79 @@ function TasksTabContent({
   };
 
   const handleDelete = async (id) => {
-    const result = await deleteTask(id);
+    const result = await deleteTask(id, accessToken);
     if (result) {
       updateDeletedTask(id);
     }
   };
 
+  const handleFilterChange = (e) => {
+    setFilters({ ...filters, [e.target.name]: e.target.value });
+  };
+
+  const handleFilterSubmit = (e) => {
+    e.preventDefault();
+    setOpenAccordions({});
+    applyTaskFilters(filters);
+  };
+
   return (
     <div className="max-w-full mt-4">
+      {taskStats && (
+        <div className="mb-4 shadow stats">
+          <div className="stat">
+            <div className="stat-title">Tasks</div>
+            <div className="stat-value">{taskStats.total}</div>
+          </div>
+          <div className="stat">
+            <div className="stat-title">Completed</div>
+            <div className="stat-value text-success">
+              {taskStats.completed}
+            </div>
+          </div>
+          <div className="stat">
+            <div className="stat-title">Open</div>
+            <div className="stat-value text-error">{taskStats.open}</div>
+          </div>
+        </div>
+      )}
+      <form
+        className="flex flex-col gap-2 mb-4 sm:flex-row"
+        onSubmit={handleFilterSubmit}
+      >
+        <input
+          type="text"
+          name="q"
+          placeholder="Search titles"
+          className="w-full max-w-xs input input-bordered input-sm"
+          value={filters.q}
+          onChange={handleFilterChange}
+        />
+        <select
+          name="completed"
+          className="select select-bordered select-sm"
+          value={filters.completed}
+          onChange={handleFilterChange}
+        >
+          <option value="">All tasks</option>
+          <option value="false">In progress</option>
+          <option value="true">Completed</option>
+        </select>
+        <select
+          name="sort"
+          className="select select-bordered select-sm"
+          value={filters.sort}
+          onChange={handleFilterChange}
+        >
+          <option value="">Oldest first</option>
+          <option value="-id">Newest first</option>
+          <option value="title">Title</option>
+          <option value="completed_at">Completion date</option>
+        </select>
+        <button type="submit" className="btn btn-sm btn-outline">
+          Filter
+        </button>
+      </form>
       <div className="overflow-x-auto">
         {tasks ? (
           tasks.length > 0 ? (
@@ -467,8 +535,9 @@ function TasksTabContent({
           )
         ) : (
           <div>
-            Your organization has no tasks. Create some and they will be shown
-            here.
+            {isFiltered
+              ? "No tasks match these filters."
+              : "Your organization has no tasks. Create some and they will be shown here."}
           </div>
         )}
       </div>
@@ -483,6 +552,7 @@ function EmployeesTabContent({
   updateEmpOrAdIsPromotedOrDemoted,
   orgId,
   isOwner,
+  accessToken,
 }) {
   const [openAccordions, setOpenAccordions] = useState({});
 
@@ -497,12 +567,12 @@ function EmployeesTabContent({
 
   const handlePromoteDemote = async (userId, who) => {
     if (who === "emp") {
-      const response = await promoteEmployee(userId, orgId);
+      const response = await promoteEmployee(userId, orgId, accessToken);
       if (response) {
         updateEmpOrAdIsPromotedOrDemoted(userId, who);
       }
     } else if (who === "ad") {
-      const response = await demoteAdmin(userId, orgId);
+      const response = await demoteAdmin(userId, orgId, accessToken);
       if (response) {
         updateEmpOrAdIsPromotedOrDemoted(userId, who);
       }
@@ -511,12 +581,12 @@ function EmployeesTabContent({
 
   const handleDelete = async (userId, who) => {
     if (who === "emp") {
-      const response = await deleteEmployee(userId, orgId);
+      const response = await deleteEmployee(userId, orgId, accessToken);
       if (response) {
         updateEmpOrAdIsDeleted(userId, who);
       }
     } else if (who === "ad") {
-      const response = await deleteAdmin(userId, orgId);
+      const response = await deleteAdmin(userId, orgId, accessToken);
       if (response) {
         updateEmpOrAdIsDeleted(userId, who);
       }
@@ -722,6 +792,29 @@ function OptionsTabContent({ orgId, orgInvs, updateIsDeleted, accessToken }) {
   const [updateOrgStatus, setUpdateOrgStatus] = useState("");
   const [orgName, setOrgName] = useState("");
   const [coOwnersEmails, setCoOwnersEmails] = useState("");
+  const [inviteEmail, setInviteEmail] = useState("");
+  const [emailSuggestions, setEmailSuggestions] = useState([]);
+
+  // suggests users while typing, once the typing pauses
+  useEffect(() => {
+    if (inviteEmail.trim().length < 2) {
+      setEmailSuggestions([]);
+      return;
+    }
+
+    let cancelled = false;
+    const timeout = setTimeout(async () => {
+      const users = await searchUsers(orgId, inviteEmail.trim());
+      if (!cancelled) {
+        setEmailSuggestions(users);
+      }
+    }, 200);
+    return () => {
+      cancelled = true;
+      clearTimeout(timeout);
+    };
+  }, [orgId, inviteEmail]);
+
   const handleSubmitInvitation = async (e) => {
     e.preventDefault();
 
@@ -732,7 +825,7 @@ function OptionsTabContent({ orgId, orgInvs, updateIsDeleted, accessToken }) {
   };
 
   const handleDelete = async (user_id) => {
-    const response = await deleteOrganizationInvitation(orgId, user_id);
+    const response = await deleteOrganizationInvitation(orgId, user_id, accessToken);
     if (response) {
       updateIsDeleted(user_id);
     }
@@ -744,7 +837,7 @@ function OptionsTabContent({ orgId, orgInvs, updateIsDeleted, accessToken }) {
     const title = e.target.title.value;
     const description = e.target.description.value;
 
-    const result = await addTaskData(orgId, title, description);
+    const result = await addTaskData(orgId, title, description, accessToken);
     setTaskSubStatus(result);
   };
 
@@ -810,8 +903,17 @@ function OptionsTabContent({ orgId, orgInvs, updateIsDeleted, accessToken }) {
               type="email"
               placeholder="Employee Email"
               name="email"
+              list="invite-email-suggestions"
+              autoComplete="off"
+              value={inviteEmail}
+              onChange={(e) => setInviteEmail(e.target.value)}
               className="w-full font-semibold text-black input bg-slate-200"
             />
+            <datalist id="invite-email-suggestions">
+              {emailSuggestions.map((user) => (
+                <option key={user.id} value={user.email} />
+              ))}
+            </datalist>
             <button className="w-full btn btn-primary" type="submit">
               Send Invitation
             </button>
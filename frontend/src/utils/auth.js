@@ -0,0 +1,90 @@
+import axios from "axios";
+
+const API_PATH = process.env.REACT_APP_API_PATH;
+
+let refreshRequest = null;
+
+// one /refresh call at a time, requests failing together share its result
+function refreshAccessToken() {
+  const refreshToken = localStorage.getItem("refresh_token");
+  if (!refreshToken) {
+    return Promise.resolve(null);
+  }
+
+  if (!refreshRequest) {
+    refreshRequest = axios
+      .post(`${API_PATH}/refresh`, null, {
+        headers: {
+          Authorization: `Bearer ${refreshToken}`,
+        },
+        skipAuthRefresh: true,
+      })
+      .then((response) => {
+        const { access_token } = response.data;
+        localStorage.setItem("access_token", access_token);
+        return access_token;
+      })
+      .catch(() => {
+        localStorage.removeItem("access_token");
+        localStorage.removeItem("refresh_token");
+        return null;
+      })
+      .finally(() => {
+        refreshRequest = null;
+      });
+  }
+  return refreshRequest;
+}
+
+// access tokens are short lived: a request rejected with an expired token is
+// retried once with a token from /refresh
+axios.interceptors.response.use(
+  (response) => response,
+  async (error) => {
+    const { config, response } = error;
+    if (
+      !config ||
+      config.skipAuthRefresh ||
+      config.retriedAfterRefresh ||
+      !response ||
+      response.status !== 401 ||
+      !config.headers ||
+      !config.headers.Authorization
+    ) {
+      return Promise.reject(error);
+    }
+
+    const accessToken = await refreshAccessToken();
+    if (!accessToken) {
+      return Promise.reject(error);
+    }
+
+    config.retriedAfterRefresh = true;
+    config.headers.Authorization = `Bearer ${accessToken}`;
+    return axios(config);
+  }
+);
+
+export async function signOut() {
+  const accessToken = localStorage.getItem("access_token");
+  const refreshToken = localStorage.getItem("refresh_token");
+
+  try {
+    if (accessToken) {
+      await axios.post(
+        `${API_PATH}/logout`,
+        { refresh_token: refreshToken },
+        {
+          headers: {
+            Authorization: `Bearer ${accessToken}`,
+          },
+        }
+      );
+    }
+  } catch (err) {
+    console.error("Failed to revoke tokens:", err.message);
+  } finally {
+    localStorage.removeItem("access_token");
+    localStorage.removeItem("refresh_token");
+  }
+}
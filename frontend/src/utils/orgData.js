@@ -15,6 +15,33 @@ export async function fetchOrganizationData(orgId) {
   }
 }
 
+export async function fetchOrganizationDashboard(orgId, token) {
+  if (!token) {
+    return null;
+  }
+
+  try {
+    const response = await axios.get(
+      `${process.env.REACT_APP_API_PATH}/organizations/${orgId}/dashboard`,
+      {
+        headers: {
+          Authorization: `Bearer ${token}`,
+        },
+      }
+    );
+
+    if (response.status === 200) {
+      return response.data;
+    } else {
+      console.error("Error fetching organization dashboard:", response.data);
+      return null;
+    }
+  } catch (err) {
+    console.error("Failed to fetch organization dashboard:", err);
+    return null;
+  }
+}
+
 export async function sendInvitation(orgId, email) {
   const accessToken = localStorage.getItem("access_token");
   try {
@@ -62,12 +89,15 @@ export async function fetchOrganizationInvitations(orgId) {
   }
 }
 
-export async function deleteOrganizationInvitation(orgId, userId) {
+export async function deleteOrganizationInvitation(orgId, userId, token) {
   try {
     const response = await axios.delete(
       `${process.env.REACT_APP_API_PATH}/delete-pending-invitation`,
       {
         params: { user_id: userId, org_id: orgId },
+        headers: {
+          Authorization: `Bearer ${token}`,
+        },
       }
     );
 
@@ -86,13 +116,18 @@ export async function deleteOrganizationInvitation(orgId, userId) {
   }
 }
 
-export async function promoteEmployee(userId, orgId) {
+export async function promoteEmployee(userId, orgId, token) {
   try {
     const response = await axios.post(
       `${process.env.REACT_APP_API_PATH}/move-employee-to-admin`,
       {
         user_id: userId,
         org_id: orgId,
+      },
+      {
+        headers: {
+          Authorization: `Bearer ${token}`,
+        },
       }
     );
 
@@ -108,13 +143,18 @@ export async function promoteEmployee(userId, orgId) {
   }
 }
 
-export async function demoteAdmin(userId, orgId) {
+export async function demoteAdmin(userId, orgId, token) {
   try {
     const response = await axios.post(
       `${process.env.REACT_APP_API_PATH}/move-admin-to-employee`,
       {
         user_id: userId,
         org_id: orgId,
+      },
+      {
+        headers: {
+          Authorization: `Bearer ${token}`,
+        },
       }
     );
 
@@ -130,12 +170,15 @@ export async function demoteAdmin(userId, orgId) {
   }
 }
 
-export async function deleteEmployee(userId, orgId) {
+export async function deleteEmployee(userId, orgId, token) {
   try {
     const response = await axios.delete(
       `${process.env.REACT_APP_API_PATH}/remove-employee`,
       {
         params: { user_id: userId, org_id: orgId },
+        headers: {
+          Authorization: `Bearer ${token}`,
+        },
       }
     );
 
@@ -151,12 +194,15 @@ export async function deleteEmployee(userId, orgId) {
   }
 }
 
-export async function deleteAdmin(userId, orgId) {
+export async function deleteAdmin(userId, orgId, token) {
   try {
     const response = await axios.delete(
       `${process.env.REACT_APP_API_PATH}/remove-admin`,
       {
         params: { user_id: userId, org_id: orgId },
+        headers: {
+          Authorization: `Bearer ${token}`,
+        },
       }
     );
 
@@ -196,3 +242,29 @@ export async function updateOrganization(orgId, orgData, token) {
     return null;
   }
 }
+
+export async function createOrganization(orgData) {
+  const accessToken = localStorage.getItem("access_token");
+  try {
+    const response = await axios.post(
+      `${process.env.REACT_APP_API_PATH}/organizations`,
+      orgData,
+      {
+        headers: {
+          "Content-Type": "application/json",
+          Authorization: `Bearer ${accessToken}`,
+        },
+      }
+    );
+
+    if (response.status === 201) {
+      return true;
+    } else {
+      console.error("Failed to add organization:", response.data);
+      return false;
+    }
+  } catch (error) {
+    console.error("API request failed", error);
+    return false;
+  }
+}
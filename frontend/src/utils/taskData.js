@@ -1,12 +1,17 @@
 import axios from "axios";
 
-export async function addTaskData(orgId, title, description) {
+export async function addTaskData(orgId, title, description, token) {
   try {
     const response = await axios.post(
       `${process.env.REACT_APP_API_PATH}/organizations/${orgId}/tasks`,
       {
         title: title,
         description: description,
+      },
+      {
+        headers: {
+          Authorization: `Bearer ${token}`,
+        },
       }
     );
 
@@ -22,10 +27,15 @@ export async function addTaskData(orgId, title, description) {
   }
 }
 
-export async function fetchTasksData(orgId) {
+// filters are passed as query parameters: completed, completed_by,
+// completed_from, completed_to, q (title contains) and sort
+export async function fetchTasksData(orgId, filters = {}) {
   try {
     const response = await axios.get(
-      `${process.env.REACT_APP_API_PATH}/organizations/${orgId}/tasks`
+      `${process.env.REACT_APP_API_PATH}/organizations/${orgId}/tasks`,
+      {
+        params: filters,
+      }
     );
 
     if (response.status === 200) {
@@ -40,6 +50,25 @@ export async function fetchTasksData(orgId) {
   }
 }
 
+export async function fetchTaskStats(orgId, days = 30) {
+  try {
+    const response = await axios.get(
+      `${process.env.REACT_APP_API_PATH}/organizations/${orgId}/tasks/stats`,
+      { params: { days } }
+    );
+
+    if (response.status === 200) {
+      return response.data;
+    } else {
+      console.error("Error fetching task stats:", response.data);
+      return null;
+    }
+  } catch (err) {
+    console.error("Error fetching task stats:", err);
+    return null;
+  }
+}
+
 export async function markCompleteTask(taskId, token) {
   try {
     const currentDate = new Date();
@@ -73,10 +102,16 @@ export async function markCompleteTask(taskId, token) {
   }
 }
 
-export async function unmarkTask(taskId) {
+export async function unmarkTask(taskId, token) {
   try {
     const response = await axios.put(
-      `${process.env.REACT_APP_API_PATH}/uncheck-task/${taskId}`
+      `${process.env.REACT_APP_API_PATH}/uncheck-task/${taskId}`,
+      null,
+      {
+        headers: {
+          Authorization: `Bearer ${token}`,
+        },
+      }
     );
 
     if (response.status === 200) {
@@ -91,10 +126,15 @@ export async function unmarkTask(taskId) {
   }
 }
 
-export async function deleteTask(taskId) {
+export async function deleteTask(taskId, token) {
   try {
     const response = await axios.delete(
-      `${process.env.REACT_APP_API_PATH}/delete-task/${taskId}`
+      `${process.env.REACT_APP_API_PATH}/delete-task/${taskId}`,
+      {
+        headers: {
+          Authorization: `Bearer ${token}`,
+        },
+      }
     );
 
     if (response.status) {
@@ -127,3 +127,29 @@ export async function declineInvitation(orgId) {
     return null;
   }
 }
+
+// users whose email starts with query and who are not in the organization or
+// invited to it yet, for autocompleting invitations
+export async function searchUsers(orgId, query) {
+  const accessToken = localStorage.getItem("access_token");
+  try {
+    const response = await axios.get(
+      `${process.env.REACT_APP_API_PATH}/users/search`,
+      {
+        params: { q: query, org_id: orgId },
+        headers: {
+          Authorization: `Bearer ${accessToken}`,
+        },
+      }
+    );
+    if (response.status === 200) {
+      return response.data;
+    } else {
+      console.error("Failed to search users");
+      return [];
+    }
+  } catch (err) {
+    console.error("API request failed", err);
+    return [];
+  }
+}